@@ -1,15 +1,42 @@
+from django.db.models import (Count, ExpressionWrapper, F, FloatField,
+                              IntegerField, OuterRef, Subquery)
+from django.db.models.functions import Coalesce, NullIf
 from django_filters import rest_framework as filters
 from rest_framework.filters import SearchFilter
 
-from recipes.models import Recipe, Tag
+from recipes.models import IngredientRecipe, Recipe, Tag
+
+
+class NumberInFilter(filters.BaseInFilter, filters.NumberFilter):
+    pass
+
+
+def count_ingredients(**lookups):
+    '''
+    Подзапрос: число строк IngredientRecipe текущего рецепта
+    '''
+    return Coalesce(
+        Subquery(
+            IngredientRecipe.objects.filter(
+                recipe=OuterRef('pk'),
+                **lookups
+            ).order_by().values('recipe').annotate(
+                count=Count('*')
+            ).values('count'),
+            output_field=IntegerField()
+        ),
+        0
+    )
 
 
 class RecipesFilter(filters.FilterSet):
-    tags = filters.ModelMultipleChoiceFilter(
-        queryset=Tag.objects.all(),
-        field_name='tags__slug',
-        to_field_name='slug'
+    tags = filters.MultipleChoiceFilter(
+        choices=lambda: [(slug, slug) for slug in Tag.get_slug_bits()],
+        method='get_tags'
     )
+    ingredients = NumberInFilter(method='get_ingredients')
+    exclude_ingredients = NumberInFilter(method='get_exclude_ingredients')
+    coverage = filters.NumberFilter(method='get_coverage')
     is_favorited = filters.BooleanFilter(method='get_is_favorited')
     is_in_shopping_cart = filters.BooleanFilter(
         method='get_is_in_shopping_cart'
@@ -17,7 +44,61 @@ class RecipesFilter(filters.FilterSet):
 
     class Meta:
         model = Recipe
-        fields = ('author', 'tags', 'is_favorited', 'is_in_shopping_cart')
+        fields = (
+            'author',
+            'tags',
+            'ingredients',
+            'exclude_ingredients',
+            'coverage',
+            'is_favorited',
+            'is_in_shopping_cart'
+        )
+
+    def get_tags(self, queryset, name, value):
+        slug_bits = Tag.get_slug_bits()
+        mask = sum(1 << slug_bits[slug] for slug in set(value))
+        return queryset.filter(tags_mask__hasanybit=mask)
+
+    def get_ingredients(self, queryset, name, value):
+        '''
+        Рецепты, в которых есть все перечисленные ингредиенты.
+        С параметром coverage фильтрация идёт в get_coverage.
+        '''
+        if self.form.cleaned_data.get('coverage'):
+            return queryset
+        ingredient_ids = set(value)
+        return queryset.filter(
+            id__in=IngredientRecipe.objects.filter(
+                ingredient_id__in=ingredient_ids
+            ).order_by().values('recipe').annotate(
+                matched=Count('ingredient', distinct=True)
+            ).filter(matched=len(ingredient_ids)).values('recipe')
+        )
+
+    def get_exclude_ingredients(self, queryset, name, value):
+        return queryset.exclude(
+            id__in=IngredientRecipe.objects.filter(
+                ingredient_id__in=set(value)
+            ).values('recipe')
+        )
+
+    def get_coverage(self, queryset, name, value):
+        '''
+        Рецепты, для которых из ingredients есть не меньше value процентов
+        ингредиентов, по убыванию этой доли
+        '''
+        ingredient_ids = set(self.form.cleaned_data.get('ingredients') or ())
+        if not ingredient_ids:
+            return queryset
+        return queryset.annotate(
+            matched=count_ingredients(ingredient_id__in=ingredient_ids),
+            total=count_ingredients()
+        ).annotate(
+            coverage=ExpressionWrapper(
+                F('matched') * 100.0 / NullIf(F('total'), 0),
+                output_field=FloatField()
+            )
+        ).filter(coverage__gte=value).order_by('-coverage', '-pub_date')
 
     def get_is_favorited(self, queryset, name, value):
         user = self.request.user
@@ -0,0 +1,33 @@
+from django.conf import settings
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from core.db import is_statement_timeout, statement_timeout
+
+
+class StatementTimeout(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'Запрос выполнялся слишком долго, попробуйте позже.'
+    default_code = 'statement_timeout'
+
+
+class StatementTimeoutMixin:
+    '''
+    Запросы к БД ограничены бюджетом STATEMENT_TIMEOUTS по
+    statement_timeout_scope, превышение отдаёт 503
+    '''
+    statement_timeout_scope = None
+
+    def dispatch(self, request, *args, **kwargs):
+        milliseconds = settings.STATEMENT_TIMEOUTS.get(
+            self.statement_timeout_scope
+        )
+        if not milliseconds:
+            return super().dispatch(request, *args, **kwargs)
+        with statement_timeout(milliseconds):
+            return super().dispatch(request, *args, **kwargs)
+
+    def handle_exception(self, exc):
+        if is_statement_timeout(exc):
+            exc = StatementTimeout()
+        return super().handle_exception(exc)
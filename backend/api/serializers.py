@@ -1,3 +1,7 @@
+import json
+
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
 from djoser.serializers import (PasswordSerializer, UserCreateSerializer,
                                 UserSerializer)
 from drf_extra_fields.fields import Base64ImageField
@@ -37,6 +41,8 @@ class CustomUserSerializer(UserSerializer):
         )
 
     def get_is_subscribed(self, obj):
+        if 'subscribed_ids' in self.context:
+            return obj.id in self.context['subscribed_ids']
         return (self.context['request'].user.is_authenticated
                 and Follow.objects.filter(
                     user=self.context['request'].user,
@@ -51,7 +57,7 @@ class CustomPasswordSerializer(PasswordSerializer):
 class TagSerializer(serializers.ModelSerializer):
     class Meta:
         model = Tag
-        fields = '__all__'
+        fields = ('id', 'name', 'slug', 'color')
 
 
 class IngredientSerializer(serializers.ModelSerializer):
@@ -70,13 +76,28 @@ class IngredientInRecipePostSerializer(serializers.ModelSerializer):
         required_fields = ('id', 'amount')
 
 
+class RecipeImageField(Base64ImageField):
+    '''
+    Картинка файлом из multipart/form-data или строкой base64
+    '''
+    def to_internal_value(self, data):
+        if isinstance(data, UploadedFile):
+            return serializers.ImageField.to_internal_value(self, data)
+        if (isinstance(data, str)
+                and len(data) * 3 // 4 > settings.MAX_UPLOAD_SIZE):
+            raise serializers.ValidationError(
+                f'Размер картинки больше {settings.MAX_UPLOAD_SIZE} байт.'
+            )
+        return super().to_internal_value(data)
+
+
 class RecipePostSerializer(serializers.ModelSerializer):
     ingredients = IngredientInRecipePostSerializer(many=True)
     tags = serializers.ListField(
         child=serializers.PrimaryKeyRelatedField(queryset=Tag.objects.all())
     )
     author = serializers.HiddenField(default=serializers.CurrentUserDefault())
-    image = Base64ImageField()
+    image = RecipeImageField()
 
     class Meta:
         model = Recipe
@@ -90,6 +111,43 @@ class RecipePostSerializer(serializers.ModelSerializer):
             'cooking_time'
         )
 
+    def to_internal_value(self, data):
+        if hasattr(data, 'getlist'):
+            data = self._parse_form_data(data)
+        return super().to_internal_value(data)
+
+    def _parse_form_data(self, form):
+        '''
+        В multipart/form-data тэги передаются повторяющимся полем
+        или JSON-массивом, ингредиенты - JSON-массивом объектов
+        или повторяющимся полем с JSON-объектами
+        '''
+        data = form.dict()
+        for field, item_is_json in (('tags', False), ('ingredients', True)):
+            if field in form:
+                data[field] = self._parse_form_list(
+                    field, form.getlist(field), item_is_json
+                )
+        return data
+
+    @staticmethod
+    def _parse_form_list(field, values, item_is_json):
+        if len(values) == 1 and values[0].lstrip().startswith('['):
+            raw = values[0]
+        elif item_is_json:
+            raw = '[' + ','.join(values) + ']'
+        else:
+            return values
+        try:
+            parsed = json.loads(raw)
+        except ValueError:
+            parsed = None
+        if not isinstance(parsed, list):
+            raise serializers.ValidationError(
+                {field: 'Ожидается JSON-массив.'}
+            )
+        return parsed
+
     def create(self, validated_data):
         tags = validated_data.pop('tags')
         ingredients = validated_data.pop('ingredients')
@@ -158,6 +216,12 @@ class IngredientInRecipeGetSerializer(serializers.ModelSerializer):
         fields = ('id', 'name', 'measurement_unit', 'amount')
 
 
+class RecipeAuthorSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = CustomUser
+        fields = ('id', 'username', 'first_name', 'last_name')
+
+
 class RecipeGetSerializer(serializers.ModelSerializer):
     ingredients = IngredientInRecipeGetSerializer(
         many=True,
@@ -171,19 +235,49 @@ class RecipeGetSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Recipe
-        fields = '__all__'
+        fields = (
+            'id',
+            'tags',
+            'author',
+            'ingredients',
+            'is_favorited',
+            'is_in_shopping_cart',
+            'name',
+            'image',
+            'text',
+            'cooking_time',
+            'pub_date',
+            'views_count'
+        )
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        fields = self.context.get('fields')
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+        if 'author' in self.fields and not self.context.get(
+            'expand_author', True
+        ):
+            self.fields['author'] = RecipeAuthorSerializer(read_only=True)
 
     def get_is_favorited(self, obj):
-        return Favorite.objects.filter(
-            user=self.context['request'].user,
-            favorite_recipe=obj
-        ).exists()
+        if 'favorited_ids' in self.context:
+            return obj.id in self.context['favorited_ids']
+        return (self.context['request'].user.is_authenticated
+                and Favorite.objects.filter(
+                    user=self.context['request'].user,
+                    favorite_recipe=obj
+        ).exists())
 
     def get_is_in_shopping_cart(self, obj):
-        return ShoppingCart.objects.filter(
-            user=self.context['request'].user,
-            recipe=obj
-        ).exists()
+        if 'in_shopping_cart_ids' in self.context:
+            return obj.id in self.context['in_shopping_cart_ids']
+        return (self.context['request'].user.is_authenticated
+                and ShoppingCart.objects.filter(
+                    user=self.context['request'].user,
+                    recipe=obj
+        ).exists())
 
 
 class RecipeInFollowSerializer(serializers.ModelSerializer):
@@ -0,0 +1,61 @@
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    '''
+    Токен-бакет по throttle_scope представления: ставка "N/период"
+    даёт всплеск до N запросов и пополнение N токенов за период.
+    Состояние - пара (токены, время) в кэше, одно чтение и одна
+    запись на проверку.
+    '''
+    rate_suffix = ''
+
+    def __init__(self):
+        pass
+
+    def allow_request(self, request, view):
+        scope = getattr(view, 'throttle_scope', None)
+        self.rate = self.THROTTLE_RATES.get(f'{scope}{self.rate_suffix}')
+        if self.rate is None:
+            return True
+        self.scope = f'{scope}{self.rate_suffix}'
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        self.key = self.get_cache_key(request, view)
+        now = self.timer()
+        tokens, updated = self.cache.get(self.key, (self.num_requests, now))
+        self.tokens = min(
+            self.num_requests,
+            tokens + (now - updated) * self.num_requests / self.duration
+        )
+        if self.tokens < 1:
+            return False
+        self.cache.set(self.key, (self.tokens - 1, now), self.duration)
+        return True
+
+    def wait(self):
+        return (1 - self.tokens) * self.duration / self.num_requests
+
+
+class UserTokenBucketThrottle(TokenBucketThrottle):
+    '''
+    Бакет пользователя, для анонимов - бакет адреса
+    '''
+    def get_cache_key(self, request, view):
+        if request.user.is_authenticated:
+            ident = request.user.pk
+        else:
+            ident = self.get_ident(request)
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
+
+
+class IPTokenBucketThrottle(TokenBucketThrottle):
+    '''
+    Бакет адреса клиента, ставка из "<scope>_ip"
+    '''
+    rate_suffix = '_ip'
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {
+            'scope': self.scope,
+            'ident': self.get_ident(request)
+        }
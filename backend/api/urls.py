@@ -5,7 +5,8 @@ from .views import (CustomUserViewSet, FavoriteViewSet,
                     FollowCreateDestroyViewSet, FollowListViewSet,
                     IngredientViewSet, RecipeViewSet,
                     ShoppingCartCreateDestroyViewSet,
-                    ShoppingCartDownloadAPIView, TagViewSet)
+                    ShoppingCartDownloadAPIView, ShoppingCartStatusAPIView,
+                    TagViewSet)
 
 router = DefaultRouter()
 
@@ -39,7 +40,13 @@ urlpatterns = [
     path('auth/', include('djoser.urls.authtoken')),
     path(
         'recipes/download_shopping_cart/',
-        ShoppingCartDownloadAPIView.as_view()
+        ShoppingCartDownloadAPIView.as_view(),
+        name='shopping-list-download'
+    ),
+    path(
+        'recipes/download_shopping_cart/status/',
+        ShoppingCartStatusAPIView.as_view(),
+        name='shopping-list-status'
     ),
     path('', include(router.urls)),
     path('', include('djoser.urls.base')),
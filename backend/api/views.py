@@ -1,28 +1,63 @@
-from django.http import HttpResponse
-from django.shortcuts import get_object_or_404
+import hashlib
+import time
+from datetime import datetime, timedelta, timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import IntegrityError
+from django.db.models import Count, Exists, Max, OuterRef, Q, Sum
+from django.http import HttpResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags, quote_etag
 from django_filters.rest_framework import DjangoFilterBackend
 from djoser.views import UserViewSet
 from rest_framework import mixins, permissions, status, views, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import SearchFilter
+from rest_framework.generics import get_object_or_404
 from rest_framework.permissions import SAFE_METHODS
 from rest_framework.response import Response
 
-from recipes.models import (Favorite, Ingredient, IngredientRecipe, Recipe,
-                            ShoppingCart, Tag)
+from core.counters import BufferedCounter
+from recipes.models import (RECIPES_GENERATION_CACHE_KEY, DeletedRecipe,
+                            Favorite, Ingredient, Recipe, ShoppingCart,
+                            SimilarRecipe, Tag)
+from recipes.scores import TOP_N, get_top_recipe_ids
+from recipes.shopping_lists import (FORMATS, build_document,
+                                    get_cached_document, get_cart_size,
+                                    get_cart_version, is_document_ready)
+from recipes.tasks import build_shopping_list, refresh_similar_recipes
+from recipes.transfer import export_recipes, import_recipes
 from users.models import CustomUser, Follow
 
 from .filters import IngredientSearchFilter, RecipesFilter
+from .mixins import StatementTimeoutMixin
 from .pagination import RecipesAndFollowsPagination
 from .permissions import (AdminPermission, CurrentUserPermission,
                           ReadOnlyPermission)
 from .serializers import (CustomPasswordSerializer, CustomUserCreateSerializer,
                           CustomUserSerializer, FavoriteSerializer,
                           FollowSerializer, IngredientSerializer,
-                          RecipeGetSerializer, RecipePostSerializer,
+                          RecipeGetSerializer, RecipeInFollowSerializer,
+                          RecipePostSerializer,
                           ShoppingCartCreateDestroySerializer, TagSerializer)
 
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+recipe_views = BufferedCounter(
+    Recipe,
+    'views_count',
+    flush_interval=settings.RECIPE_VIEWS_FLUSH_INTERVAL,
+    flush_events=settings.RECIPE_VIEWS_FLUSH_EVENTS
+)
+
 
 class CustomUserViewSet(UserViewSet):
+    filter_backends = (SearchFilter,)
+    search_fields = ('^username', '^first_name', '^last_name')
 
     def get_serializer_class(self):
         if self.action == 'create':
@@ -39,6 +74,27 @@ class CustomUserViewSet(UserViewSet):
     def get_queryset(self):
         return CustomUser.objects.all()
 
+    @action(detail=False, permission_classes=(permissions.IsAuthenticated,))
+    def suggested(self, request):
+        '''
+        Рекомендованные авторы из таблицы, которую заполняет
+        build_user_suggestions. Авторы, на которых пользователь успел
+        подписаться после расчёта, пропускаются.
+        '''
+        following = set(request.user.follower.values_list(
+            'author_id', flat=True
+        ))
+        suggestions = request.user.suggestions.select_related('suggested')
+        serializer = CustomUserSerializer(
+            [
+                item.suggested for item in suggestions
+                if item.suggested_id not in following
+            ],
+            many=True,
+            context={'request': request, 'subscribed_ids': set()}
+        )
+        return Response(serializer.data)
+
 
 class TagViewSet(viewsets.ModelViewSet):
     queryset = Tag.objects.all()
@@ -54,7 +110,7 @@ class IngredientViewSet(viewsets.ModelViewSet):
     search_fields = ('^name',)
 
 
-class RecipeViewSet(viewsets.ModelViewSet):
+class RecipeViewSet(StatementTimeoutMixin, viewsets.ModelViewSet):
     queryset = Recipe.objects.all()
     permission_classes = (
         AdminPermission | CurrentUserPermission | ReadOnlyPermission,
@@ -62,12 +118,310 @@ class RecipeViewSet(viewsets.ModelViewSet):
     pagination_class = RecipesAndFollowsPagination
     filter_backends = (DjangoFilterBackend,)
     filterset_class = RecipesFilter
+    card_fields = (
+        'id',
+        'tags',
+        'author',
+        'is_favorited',
+        'is_in_shopping_cart',
+        'name',
+        'image',
+        'cooking_time'
+    )
+    max_ids = 100
+    changes_page_size = 100
+    changes_safety_seconds = 60
+    page_cache_stale_factor = 10
+    page_cache_lock_timeout = 10
+    throttle_scope = 'recipe_create'
+    statement_timeout_scope = 'recipes'
 
     def get_serializer_class(self):
         if self.request.method in SAFE_METHODS:
             return RecipeGetSerializer
         return RecipePostSerializer
 
+    def get_throttles(self):
+        if self.action != 'create':
+            return []
+        return super().get_throttles()
+
+    def get_requested_fields(self):
+        '''
+        Поля ответа из ?fields= и ?expand=. По умолчанию список
+        отдаёт карточки (card_fields) с кратким автором, а выборка
+        по ?ids= - полное представление, как у отдельного рецепта.
+        '''
+        params = self.request.query_params
+        all_fields = RecipeGetSerializer.Meta.fields
+        expand = set(params.get('expand', '').split(',')) & set(all_fields)
+        if params.get('fields'):
+            fields = set(params['fields'].split(',')) & set(all_fields)
+        elif (self.action in ('list', 'changes', 'popular', 'trending')
+                and 'ids' not in params):
+            fields = set(self.card_fields)
+        else:
+            fields = set(all_fields)
+            expand.add('author')
+        return fields | expand, 'author' in expand
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.request.method not in SAFE_METHODS:
+            return queryset
+        fields = self.get_requested_fields()[0]
+        if 'text' not in fields:
+            queryset = queryset.defer('text')
+        if 'author' in fields:
+            queryset = queryset.select_related('author')
+        related = [
+            lookup for field, lookup in (
+                ('tags', 'tags'),
+                ('ingredients', 'ingredient__ingredient'),
+            ) if field in fields
+        ]
+        return queryset.prefetch_related(*related)
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.request.method in SAFE_METHODS:
+            fields, expand_author = self.get_requested_fields()
+            context.update(fields=fields, expand_author=expand_author)
+        return context
+
+    def get_requested_ids(self):
+        ids = self.request.query_params.get('ids')
+        if ids is None:
+            return None
+        try:
+            ids = [int(pk) for pk in ids.split(',') if pk]
+        except ValueError:
+            raise ValidationError(
+                {'ids': 'Ожидается список id через запятую.'}
+            )
+        if len(ids) > self.max_ids:
+            raise ValidationError(
+                {'ids': f'Можно запросить не больше {self.max_ids} рецептов.'}
+            )
+        return ids
+
+    def get_user_flags(self, recipes):
+        '''
+        Избранное, список покупок и подписки на авторов одним запросом
+        на всю страницу вместо запроса на каждый рецепт
+        '''
+        user = self.request.user
+        if not user.is_authenticated:
+            return {
+                'favorited_ids': set(),
+                'in_shopping_cart_ids': set(),
+                'subscribed_ids': set(),
+            }
+        recipe_ids = [recipe.id for recipe in recipes]
+        flags = {
+            'favorited_ids': set(Favorite.objects.filter(
+                user=user,
+                favorite_recipe_id__in=recipe_ids
+            ).values_list('favorite_recipe_id', flat=True)),
+            'in_shopping_cart_ids': set(ShoppingCart.objects.filter(
+                user=user,
+                recipe_id__in=recipe_ids
+            ).values_list('recipe_id', flat=True)),
+        }
+        if self.get_requested_fields()[1]:
+            flags['subscribed_ids'] = set(Follow.objects.filter(
+                user=user,
+                author_id__in={recipe.author_id for recipe in recipes}
+            ).values_list('author_id', flat=True))
+        return flags
+
+    def make_etag(self, *state):
+        '''
+        ETag из состояния данных, пользователя и параметров запроса
+        '''
+        key = repr((
+            state,
+            self.request.user.pk,
+            self.request.get_full_path(),
+            self.request.accepted_media_type,
+        ))
+        return quote_etag(hashlib.md5(key.encode()).hexdigest())
+
+    def get_list_etag(self, queryset):
+        '''
+        Поколение рецептов покрывает переименование тэгов, ингредиентов
+        и авторов, которое не меняет Recipe.modified
+        '''
+        fields, expand_author = self.get_requested_fields()
+        aggregates = [Max('modified'), Count('id')]
+        if 'views_count' in fields:
+            aggregates.append(Sum('views_count'))
+        state = [
+            cache.get(RECIPES_GENERATION_CACHE_KEY, 0),
+            queryset.aggregate(*aggregates),
+        ]
+        user = self.request.user
+        if user.is_authenticated:
+            for model in (Favorite, ShoppingCart):
+                state.append(model.objects.filter(user=user).aggregate(
+                    Max('pub_date'), Count('id')
+                ))
+            if expand_author:
+                state.append(Follow.objects.filter(user=user).aggregate(
+                    Max('id'), Count('id')
+                ))
+        return self.make_etag(*state)
+
+    def get_detail_etag(self, pk):
+        user = self.request.user
+        queryset = Recipe.objects.filter(pk=pk)
+        if user.is_authenticated:
+            queryset = queryset.annotate(
+                favorited=Exists(Favorite.objects.filter(
+                    user=user, favorite_recipe=OuterRef('pk')
+                )),
+                in_shopping_cart=Exists(ShoppingCart.objects.filter(
+                    user=user, recipe=OuterRef('pk')
+                )),
+                subscribed=Exists(Follow.objects.filter(
+                    user=user, author=OuterRef('author')
+                ))
+            ).values_list(
+                'modified', 'views_count',
+                'favorited', 'in_shopping_cart', 'subscribed'
+            )
+        else:
+            queryset = queryset.values_list('modified', 'views_count')
+        state = queryset.first()
+        if state is None:
+            return None
+        return self.make_etag(
+            cache.get(RECIPES_GENERATION_CACHE_KEY, 0), *state
+        )
+
+    def not_modified(self, etag):
+        '''
+        304 без сериализации, если ETag совпал с If-None-Match
+        '''
+        if_none_match = self.request.META.get('HTTP_IF_NONE_MATCH')
+        if not if_none_match:
+            return None
+        weak_etags = {
+            tag[2:] if tag.startswith('W/') else tag
+            for tag in parse_etags(if_none_match)
+        }
+        if etag not in weak_etags and '*' not in weak_etags:
+            return None
+        return Response(status=status.HTTP_304_NOT_MODIFIED)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(
+            request, response, *args, **kwargs
+        )
+        etag = getattr(self, 'etag', None)
+        if etag and response.status_code in (
+            status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED
+        ):
+            response['ETag'] = etag
+            patch_vary_headers(response, ('Authorization',))
+        return response
+
+    def get_page_cache_key(self):
+        '''
+        Ключ страницы из нормализованных параметров запроса:
+        порядок и повторы значений не важны, page=1 - первая страница
+        '''
+        params = self.request.query_params
+        normalized = []
+        for key in sorted(params):
+            values = sorted(set(params.getlist(key)) - {''})
+            if values and (key, values) != ('page', ['1']):
+                normalized.append((key, values))
+        key = repr((
+            self.request.get_host(),
+            self.request.accepted_media_type,
+            normalized,
+        ))
+        return f'recipes:page:{hashlib.md5(key.encode()).hexdigest()}'
+
+    def get_cached_page(self):
+        '''
+        Готовая страница списка для анонимов. Кэш сбрасывается сменой
+        поколения рецептов; устаревшую страницу перестраивает один
+        воркер, остальные пока отдают старую копию. Без копии страница
+        строится без блокировки, чужая блокировка не снимается.
+        '''
+        key = self.get_page_cache_key()
+        generation = cache.get(RECIPES_GENERATION_CACHE_KEY, 0)
+        page = cache.get(key)
+        if page is not None and (
+            page['generation'] == generation
+            and page['fresh_until'] > time.time()
+        ):
+            return page
+        lock_key = f'{key}:lock'
+        locked = cache.add(lock_key, 1, self.page_cache_lock_timeout)
+        if not locked and page is not None:
+            return page
+        try:
+            queryset = self.filter_queryset(self.get_queryset())
+            timeout = settings.RECIPES_PAGE_CACHE_TIMEOUT
+            page = {
+                'generation': generation,
+                'fresh_until': time.time() + timeout,
+                'etag': self.get_list_etag(queryset),
+                'data': self.get_list_data(queryset),
+            }
+            cache.set(key, page, timeout * self.page_cache_stale_factor)
+        finally:
+            if locked:
+                cache.delete(lock_key)
+        return page
+
+    def list(self, request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            page = self.get_cached_page()
+            self.etag = page['etag']
+            not_modified = self.not_modified(self.etag)
+            if not_modified is not None:
+                return not_modified
+            return Response(page['data'])
+        queryset = self.filter_queryset(self.get_queryset())
+        self.etag = self.get_list_etag(queryset)
+        not_modified = self.not_modified(self.etag)
+        if not_modified is not None:
+            return not_modified
+        return Response(self.get_list_data(queryset))
+
+    def get_list_data(self, queryset):
+        ids = self.get_requested_ids()
+        if ids is None:
+            recipes = self.paginate_queryset(queryset)
+        else:
+            recipes_by_id = queryset.in_bulk(ids)
+            recipes = [recipes_by_id[pk] for pk in ids if pk in recipes_by_id]
+        context = self.get_serializer_context()
+        context.update(self.get_user_flags(recipes))
+        serializer = RecipeGetSerializer(recipes, many=True, context=context)
+        if ids is None:
+            return self.get_paginated_response(serializer.data).data
+        return serializer.data
+
+    def retrieve(self, request, *args, **kwargs):
+        try:
+            pk = int(kwargs['pk'])
+        except ValueError:
+            pk = None
+        self.etag = pk and self.get_detail_etag(pk)
+        if self.etag:
+            recipe_views.increment(pk)
+            not_modified = self.not_modified(self.etag)
+            if not_modified is not None:
+                return not_modified
+        instance = self.get_object()
+        serializer = self.get_serializer(instance)
+        return Response(serializer.data)
+
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -99,6 +453,161 @@ class RecipeViewSet(viewsets.ModelViewSet):
 
     def perform_create(self, serializer):
         serializer.save(author=self.request.user)
+        refresh_similar_recipes.delay()
+
+    def perform_update(self, serializer):
+        serializer.save()
+        refresh_similar_recipes.delay()
+
+    @action(detail=False)
+    def changes(self, request):
+        '''
+        Лента изменений: рецепты, созданные или изменённые после курсора,
+        и id удалённых. Курсор - "<микросекунды>-<id>" последнего
+        отданного изменения. На последней странице курсор отстаёт от
+        текущего времени на changes_safety_seconds: запись, закоммиченная
+        позже своего modified, не будет пропущена, а повторно пришедшие
+        рецепты клиент сводит по id.
+        '''
+        since, since_id = self._parse_cursor(request.query_params.get('since'))
+        changed = list(
+            self.get_queryset().filter(
+                Q(modified__gt=since) | Q(modified=since, id__gt=since_id)
+            ).order_by('modified', 'id')[:self.changes_page_size + 1]
+        )
+        has_more = len(changed) > self.changes_page_size
+        changed = changed[:self.changes_page_size]
+        if has_more:
+            until, until_id = changed[-1].modified, changed[-1].id
+        else:
+            until, until_id = max((since, since_id), (
+                datetime.now(timezone.utc)
+                - timedelta(seconds=self.changes_safety_seconds),
+                0
+            ))
+        deleted = DeletedRecipe.objects.filter(deleted_at__gt=since)
+        if has_more:
+            deleted = deleted.filter(deleted_at__lte=until)
+
+        context = self.get_serializer_context()
+        context.update(self.get_user_flags(changed))
+        serializer = RecipeGetSerializer(changed, many=True, context=context)
+        return Response({
+            'cursor': f'{(until - EPOCH) // timedelta(microseconds=1)}-'
+                      f'{until_id}',
+            'has_more': has_more,
+            'created': [
+                recipe.id for recipe in changed if recipe.pub_date > since
+            ],
+            'updated': [
+                recipe.id for recipe in changed if recipe.pub_date <= since
+            ],
+            'deleted': list(deleted.values_list('recipe_id', flat=True)),
+            'results': serializer.data,
+        })
+
+    def _parse_cursor(self, cursor):
+        if not cursor:
+            return EPOCH, 0
+        try:
+            microseconds, recipe_id = map(int, cursor.split('-'))
+            return EPOCH + timedelta(microseconds=microseconds), recipe_id
+        except (ValueError, OverflowError):
+            raise ValidationError({'since': 'Некорректный курсор.'})
+
+    @action(detail=False, permission_classes=(AdminPermission,))
+    def export(self, request):
+        response = StreamingHttpResponse(
+            export_recipes(),
+            content_type='application/x-ndjson; charset=utf-8'
+        )
+        response['Content-Disposition'] = (
+            'attachment; filename="recipes.ndjson"'
+        )
+        return response
+
+    @action(
+        detail=False,
+        methods=('post',),
+        url_path='import',
+        permission_classes=(AdminPermission,)
+    )
+    def import_recipes(self, request):
+        '''
+        Загрузка NDJSON из тела запроса без буферизации. После обрыва
+        можно продолжить, передав ?skip= из ответа или с числом строк,
+        которые точно загружены.
+        '''
+        try:
+            skip = int(request.query_params.get('skip', 0))
+        except ValueError:
+            raise ValidationError({'skip': 'Ожидается число строк.'})
+        checkpoint = {'processed': skip}
+
+        def save_checkpoint(done):
+            checkpoint['processed'] = done
+
+        try:
+            processed, imported = import_recipes(
+                request.stream or (), skip=skip, on_batch=save_checkpoint
+            )
+        except (ValueError, KeyError, IntegrityError,
+                DjangoValidationError) as error:
+            return Response(
+                {
+                    'detail': f'Некорректная строка: {error}',
+                    'processed': checkpoint['processed'],
+                },
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response({'processed': processed, 'imported': imported})
+
+    @action(detail=True)
+    def similar(self, request, pk):
+        recipe = get_object_or_404(Recipe, pk=pk)
+        similar = SimilarRecipe.objects.filter(
+            recipe=recipe
+        ).select_related('similar_recipe')
+        serializer = RecipeInFollowSerializer(
+            [item.similar_recipe for item in similar],
+            many=True,
+            context={'request': request}
+        )
+        return Response(serializer.data)
+
+    @action(detail=False)
+    def popular(self, request):
+        return self._ranking_response(request, 'popular')
+
+    @action(detail=False)
+    def trending(self, request):
+        return self._ranking_response(request, 'trending')
+
+    def _ranking_response(self, request, ranking):
+        recipe_ids = get_top_recipe_ids(
+            ranking,
+            request.query_params.getlist('tags')
+        )[:self.get_ranking_limit()]
+        recipes_by_id = self.get_queryset().in_bulk(recipe_ids)
+        recipes = [
+            recipes_by_id[pk] for pk in recipe_ids if pk in recipes_by_id
+        ]
+        context = self.get_serializer_context()
+        context.update(self.get_user_flags(recipes))
+        serializer = RecipeGetSerializer(recipes, many=True, context=context)
+        return Response(serializer.data)
+
+    def get_ranking_limit(self):
+        limit = self.request.query_params.get('limit', 10)
+        try:
+            limit = int(limit)
+        except ValueError:
+            limit = 0
+        if limit < 1:
+            raise ValidationError(
+                {'limit': 'Ожидается положительное целое число.'}
+            )
+        return min(limit, TOP_N)
 
 
 class FollowBaseViewSet(viewsets.GenericViewSet):
@@ -117,6 +626,7 @@ class FollowCreateDestroyViewSet(
     mixins.DestroyModelMixin,
     FollowBaseViewSet
 ):
+    throttle_scope = 'follow'
 
     def get_serializer_context(self):
         context = super().get_serializer_context()
@@ -146,6 +656,7 @@ class FavoriteViewSet(
     viewsets.GenericViewSet
 ):
     serializer_class = FavoriteSerializer
+    throttle_scope = 'favorite'
 
     def get_queryset(self):
         return Favorite.objects.filter(user=self.request.user)
@@ -178,6 +689,7 @@ class ShoppingCartCreateDestroyViewSet(
 ):
     queryset = ShoppingCart.objects.all()
     serializer_class = ShoppingCartCreateDestroySerializer
+    throttle_scope = 'shopping_cart'
 
     def get_serializer_context(self):
         context = super().get_serializer_context()
@@ -200,34 +712,76 @@ class ShoppingCartCreateDestroyViewSet(
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
-class ShoppingCartDownloadAPIView(views.APIView):
-
-    def get_queryset(self):
-        return ShoppingCart.objects.filter(user=self.request.user)
+class ShoppingCartDownloadAPIView(StatementTimeoutMixin, views.APIView):
+    throttle_scope = 'shopping_list'
+    statement_timeout_scope = 'shopping_list'
+    poll_interval = 5
 
     def get(self, request):
-        response = HttpResponse(content_type='text/plain')
+        '''
+        Список покупок из кэша по версии корзины. Большую корзину
+        собирает фоновая задача, клиент опрашивает адрес из Location.
+        '''
+        file_format = self.get_file_format()
+        user_id = request.user.pk
+        version = get_cart_version(user_id)
+        content = get_cached_document(user_id, version, file_format)
+        if content is None:
+            if self.is_async(user_id):
+                return self.building(user_id, version, file_format)
+            content = build_document(user_id, version, file_format)
+        content_type, filename = FORMATS[file_format]
+        response = HttpResponse(
+            content,
+            content_type=f'{content_type}; charset=utf-8'
+        )
         response['Content-Disposition'] = (
-            'attachment; filename="shopping_list.txt"'
+            f'attachment; filename="{filename}"'
         )
-        return self._create_shopping_list(self.get_queryset(), response)
+        return response
 
-    def _create_shopping_list(self, queryset, response):
-        ingredients_and_amount = {}
-        response.write('Список продуктов:\n')
-        for item in queryset:
-            ingredients_recipe = IngredientRecipe.objects.filter(
-                recipe=item.recipe
+    def get_file_format(self):
+        file_format = self.request.query_params.get('type', 'txt')
+        if file_format not in FORMATS:
+            raise ValidationError(
+                {'type': f'Доступные форматы: {", ".join(FORMATS)}.'}
             )
-            for row in ingredients_recipe:
-                ingredient = row.ingredient
-                amount = row.amount
-                if ingredient in ingredients_and_amount:
-                    ingredients_and_amount[ingredient] += amount
-                else:
-                    ingredients_and_amount[ingredient] = amount
-        for ingredient, amount in ingredients_and_amount.items():
-            response.write(f'\n{ingredient.name}')
-            response.write((f' ({ingredient.measurement_unit})'))
-            response.write(f' - {amount}')
+        return file_format
+
+    def is_async(self, user_id):
+        return get_cart_size(user_id) > settings.SHOPPING_LIST_ASYNC_THRESHOLD
+
+    def building(self, user_id, version, file_format):
+        build_shopping_list.delay(user_id, version, file_format)
+        response = Response(
+            {'detail': 'Список покупок готовится.'},
+            status=status.HTTP_202_ACCEPTED
+        )
+        response['Location'] = (
+            f'{reverse("shopping-list-status")}?type={file_format}'
+        )
+        response['Retry-After'] = str(self.poll_interval)
+        return response
+
+
+class ShoppingCartStatusAPIView(ShoppingCartDownloadAPIView):
+    '''
+    Опрос готовности большого списка покупок. Не расходует токены
+    shopping_list: пока список собирается, отвечает 202, готовый
+    список перенаправляет на скачивание.
+    '''
+    def get_throttles(self):
+        return []
+
+    def get(self, request):
+        file_format = self.get_file_format()
+        user_id = request.user.pk
+        version = get_cart_version(user_id)
+        if (not is_document_ready(user_id, version, file_format)
+                and self.is_async(user_id)):
+            return self.building(user_id, version, file_format)
+        response = Response(status=status.HTTP_303_SEE_OTHER)
+        response['Location'] = (
+            f'{reverse("shopping-list-download")}?type={file_format}'
+        )
         return response
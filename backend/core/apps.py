@@ -1,5 +1,14 @@
 from django.apps import AppConfig
+from django.core.signals import request_started
+from django.utils.module_loading import autodiscover_modules
 
 
 class CoreConfig(AppConfig):
     name = 'core'
+
+    def ready(self):
+        from .db import check_connections
+
+        request_started.connect(check_connections)
+        # Регистрация фоновых задач всех приложений для run_tasks
+        autodiscover_modules('tasks')
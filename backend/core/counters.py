@@ -0,0 +1,70 @@
+import atexit
+import threading
+
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from django.db.models import Case, F, IntegerField, Value, When
+
+
+class BufferedCounter:
+    '''
+    Счётчик, накапливающий приращения в памяти процесса. Приращения
+    сбрасываются в базу одним UPDATE ... CASE через flush_interval секунд
+    после первого события, после flush_events событий и при завершении
+    процесса.
+    '''
+    def __init__(self, model, field, flush_interval=10, flush_events=100):
+        self.model = model
+        self.field = field
+        self.flush_interval = flush_interval
+        self.flush_events = flush_events
+        self._pending = {}
+        self._events = 0
+        self._lock = threading.Lock()
+        self._timer = None
+        atexit.register(self.flush)
+
+    def increment(self, pk, value=1):
+        with self._lock:
+            self._pending[pk] = self._pending.get(pk, 0) + value
+            self._events += 1
+            flush_now = self._events >= self.flush_events
+            if not flush_now and self._timer is None:
+                self._timer = threading.Timer(
+                    self.flush_interval,
+                    self._flush_in_background
+                )
+                self._timer.daemon = True
+                self._timer.start()
+        if flush_now:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._events = 0
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if not pending:
+            return 0
+        increments = Case(
+            *[When(pk=pk, then=Value(count)) for pk, count in pending.items()],
+            default=Value(0),
+            output_field=IntegerField()
+        )
+        try:
+            self.model.objects.using(DEFAULT_DB_ALIAS).filter(
+                pk__in=pending
+            ).update(**{self.field: F(self.field) + increments})
+        except DatabaseError:
+            with self._lock:
+                for pk, count in pending.items():
+                    self._pending[pk] = self._pending.get(pk, 0) + count
+            return 0
+        return len(pending)
+
+    def _flush_in_background(self):
+        try:
+            self.flush()
+        finally:
+            connections.close_all()
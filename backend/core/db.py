@@ -0,0 +1,47 @@
+from contextlib import ExitStack, contextmanager
+
+from django.db import OperationalError, connections
+
+QUERY_CANCELED = '57014'
+
+
+def check_connections(**kwargs):
+    '''
+    Проверка постоянных соединений перед переиспользованием:
+    оборванное соединение закрывается, Django откроет новое
+    '''
+    for connection in connections.all():
+        if (
+            connection.connection is not None
+            and not connection.in_atomic_block
+            and not connection.is_usable()
+        ):
+            connection.close()
+
+
+@contextmanager
+def statement_timeout(milliseconds):
+    '''
+    Ограничение времени запросов PostgreSQL внутри блока. SET LOCAL
+    отправляется в одной строке с запросом и действует только в его
+    транзакции, поэтому совместимо с PgBouncer и не требует сброса.
+    '''
+    prefix = f'SET LOCAL statement_timeout = {int(milliseconds)}; '
+
+    def apply(execute, sql, params, many, context):
+        if getattr(context['cursor'].cursor, 'name', None) is None:
+            sql = prefix + sql
+        return execute(sql, params, many, context)
+
+    with ExitStack() as stack:
+        for connection in connections.all():
+            if connection.vendor == 'postgresql':
+                stack.enter_context(connection.execute_wrapper(apply))
+        yield
+
+
+def is_statement_timeout(exc):
+    return (
+        isinstance(exc, OperationalError)
+        and getattr(exc.__cause__, 'pgcode', None) == QUERY_CANCELED
+    )
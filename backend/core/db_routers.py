@@ -0,0 +1,46 @@
+import random
+import threading
+
+from django.conf import settings
+
+_state = threading.local()
+
+
+def use_replica(value):
+    '''
+    Реплика выбирается один раз на запрос: счётчик и страница
+    читаются из одной базы с одним и тем же отставанием
+    '''
+    _state.replica = (
+        random.choice(settings.DATABASE_REPLICAS)
+        if value and settings.DATABASE_REPLICAS else None
+    )
+
+
+def written():
+    return getattr(_state, 'written', False)
+
+
+def reset():
+    _state.replica = None
+    _state.written = False
+
+
+class PrimaryReplicaRouter:
+    '''
+    Чтения безопасных запросов уходят на реплики, записи и всё,
+    что читается после записи в том же запросе, — на default
+    '''
+    def db_for_read(self, model, **hints):
+        return getattr(_state, 'replica', None) or 'default'
+
+    def db_for_write(self, model, **hints):
+        _state.replica = None
+        _state.written = True
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.query_plans import ALLOWED_FULL_SCANS, explain_hot_queries
+
+
+class Command(BaseCommand):
+    help = (
+        'EXPLAIN горячих запросов: ошибка, если какой-то из них '
+        'читает таблицу целиком вместо поиска по индексу'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verbose-plans', action='store_true')
+
+    def handle(self, *args, **options):
+        try:
+            plans = explain_hot_queries()
+        except NotImplementedError as error:
+            raise CommandError(error)
+        failures = []
+        for name, plan, tables in plans:
+            if options['verbose_plans']:
+                self.stdout.write(f'{name}:\n{plan}\n')
+            if not tables:
+                self.stdout.write(f'{name}: ok')
+            elif name in ALLOWED_FULL_SCANS:
+                self.stdout.write(f'{name}: {ALLOWED_FULL_SCANS[name]}')
+            else:
+                failures.append(f'{name}: {", ".join(tables)}')
+        if failures:
+            raise CommandError(
+                'Полное чтение таблиц:\n' + '\n'.join(failures)
+            )
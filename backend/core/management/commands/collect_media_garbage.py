@@ -0,0 +1,47 @@
+from datetime import timedelta
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from core.models import MediaFile
+
+
+class Command(BaseCommand):
+    help = 'Удаление медиафайлов, на которые больше нет ссылок'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--grace-hours',
+            type=int,
+            default=24,
+            help='Не трогать файлы, потерявшие ссылки позже этого срока'
+        )
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        orphans = MediaFile.objects.filter(
+            references=0,
+            modified__lt=timezone.now() - timedelta(
+                hours=options['grace_hours']
+            )
+        )
+        deleted = 0
+        for media_file in orphans.iterator():
+            if options['dry_run']:
+                self.stdout.write(media_file.name)
+                continue
+            # Ссылка или повторная загрузка могли появиться после
+            # выборки: строка перепроверяется под блокировкой, и файл
+            # удаляется до строки, пока загрузка ждёт блокировку
+            with transaction.atomic():
+                if not list(orphans.select_for_update().filter(
+                    pk=media_file.pk
+                ).values_list('pk', flat=True)):
+                    continue
+                default_storage.delete(media_file.name)
+                MediaFile.objects.filter(pk=media_file.pk).delete()
+            self.stdout.write(media_file.name)
+            deleted += 1
+        self.stdout.write(f'Удалено файлов: {deleted}')
@@ -0,0 +1,57 @@
+import io
+import os
+import pstats
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.profiling import load_profiles
+
+
+class Command(BaseCommand):
+    help = 'Сводка сохранённых профилей запросов'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=10)
+        parser.add_argument(
+            '--show',
+            help='Имя профиля: вывести самые дорогие функции'
+        )
+        parser.add_argument('--sort', default='cumulative')
+
+    def handle(self, *args, **options):
+        if options['show']:
+            return self.show(options['show'], options['sort'], options['top'])
+        profiles = load_profiles()
+        if not profiles:
+            self.stdout.write(f'Профилей в {settings.PROFILE_DIR} нет')
+            return None
+        by_view = defaultdict(list)
+        for meta in profiles:
+            by_view[meta['view']].append(meta['duration_ms'])
+        self.stdout.write('view: запросов, среднее, максимум (мс)')
+        for view, durations in sorted(
+            by_view.items(), key=lambda item: -max(item[1])
+        )[:options['top']]:
+            self.stdout.write(
+                f'{view}: {len(durations)}, '
+                f'{sum(durations) / len(durations):.1f}, {max(durations):.1f}'
+            )
+        self.stdout.write('\nСамые медленные запросы:')
+        for meta in profiles[:options['top']]:
+            self.stdout.write(
+                f'{meta["duration_ms"]:.1f} ms {meta["method"]} '
+                f'{meta["path"]} [{meta["status"]}, {meta["reason"]}] '
+                f'{meta["name"]}'
+            )
+        return None
+
+    def show(self, name, sort, top):
+        path = os.path.join(settings.PROFILE_DIR, f'{name}.pstats')
+        if not os.path.exists(path):
+            raise CommandError(f'Профиль {name} не найден')
+        output = io.StringIO()
+        stats = pstats.Stats(path, stream=output)
+        stats.sort_stats(sort).print_stats(top)
+        self.stdout.write(output.getvalue())
@@ -0,0 +1,64 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, close_old_connections, connections
+
+from core.tasks import DatabaseBackend
+
+
+class Command(BaseCommand):
+    help = 'Обработчик очереди фоновых задач'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=4)
+        parser.add_argument('--poll-interval', type=float, default=1.0)
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Выполнить готовые задачи и завершиться'
+        )
+
+    def handle(self, *args, **options):
+        self.backend = DatabaseBackend()
+        self.backend.schedule_periodic()
+        self.stop = threading.Event()
+        with ThreadPoolExecutor(max_workers=options['threads']) as pool:
+            workers = [
+                pool.submit(
+                    self.work, options['poll_interval'], options['once']
+                )
+                for _ in range(options['threads'])
+            ]
+            try:
+                for worker in workers:
+                    worker.result()
+            except KeyboardInterrupt:
+                self.stop.set()
+
+    def work(self, poll_interval, once):
+        try:
+            while not self.stop.is_set():
+                close_old_connections()
+                try:
+                    queued = self.backend.claim()
+                    if queued is None:
+                        if once:
+                            return
+                        self.stop.wait(poll_interval)
+                        continue
+                    succeeded = self.backend.run(queued)
+                except DatabaseError as error:
+                    # Разрыв соединения или блокировка не должны
+                    # останавливать обработчик: задача, взятая в работу,
+                    # вернётся в очередь по истечении аренды
+                    self.stderr.write(f'Ошибка БД: {error}')
+                    close_old_connections()
+                    self.stop.wait(poll_interval)
+                    continue
+                if succeeded:
+                    self.stdout.write(f'{queued.name}: ok')
+                else:
+                    self.stderr.write(f'{queued.name}: ошибка')
+        finally:
+            connections.close_all()
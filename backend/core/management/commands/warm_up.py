@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.warmup import STEPS, format_timings, warm_up
+
+
+class Command(BaseCommand):
+    help = 'Прогрев приложения с разбивкой времени по шагам'
+
+    def add_arguments(self, parser):
+        parser.add_argument('steps', nargs='*', help=', '.join(STEPS))
+
+    def handle(self, *args, **options):
+        steps = options['steps'] or tuple(STEPS)
+        unknown = set(steps) - set(STEPS)
+        if unknown:
+            raise CommandError(f'Неизвестные шаги: {", ".join(unknown)}')
+        self.stdout.write(format_timings(warm_up(steps)))
@@ -0,0 +1,298 @@
+import hashlib
+import random
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, JsonResponse
+from django.utils import timezone
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.text import compress_sequence, compress_string
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.exceptions import AuthenticationFailed
+
+from . import db_routers
+from .models import IdempotencyKey
+from .profiling import profile_request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+BROTLI_QUALITY = 5
+COMPRESSIBLE_TYPES = ('application/json', 'text/')
+# Детерминированные ошибки: повтор того же запроса даст тот же ответ
+REPLAYABLE_CLIENT_ERRORS = (400, 404, 405, 422)
+
+
+def parse_accept_encoding(header):
+    '''
+    Разбор заголовка Accept-Encoding в словарь {кодировка: q}
+    '''
+    accepted = {}
+    for item in header.split(','):
+        coding, _, params = item.partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[coding] = quality
+    return accepted
+
+
+def choose_encoding(header):
+    accepted = parse_accept_encoding(header)
+    wildcard = accepted.get('*', 0.0)
+    if brotli is not None and accepted.get('br', wildcard) > 0:
+        return 'br'
+    if accepted.get('gzip', wildcard) > 0:
+        return 'gzip'
+    return None
+
+
+def brotli_sequence(sequence):
+    compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+    for item in sequence:
+        chunk = compressor.process(item)
+        if chunk:
+            yield chunk
+    yield compressor.finish()
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    '''
+    Сжатие ответов brotli или gzip по заголовку Accept-Encoding.
+    Ответы короче COMPRESSION_MIN_SIZE байт отдаются как есть.
+    '''
+    def process_response(self, request, response):
+        if response.has_header('Content-Encoding'):
+            return response
+        if not response.get('Content-Type', '').startswith(
+            COMPRESSIBLE_TYPES
+        ):
+            return response
+        if (not response.streaming
+                and len(response.content) < settings.COMPRESSION_MIN_SIZE):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = choose_encoding(
+            request.META.get('HTTP_ACCEPT_ENCODING', '')
+        )
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            if encoding == 'br':
+                response.streaming_content = brotli_sequence(
+                    response.streaming_content
+                )
+            else:
+                response.streaming_content = compress_sequence(
+                    response.streaming_content
+                )
+            del response['Content-Length']
+        else:
+            if encoding == 'br':
+                compressed_content = brotli.compress(
+                    response.content,
+                    quality=BROTLI_QUALITY
+                )
+            else:
+                compressed_content = compress_string(response.content)
+            if len(compressed_content) >= len(response.content):
+                return response
+            response.content = compressed_content
+            response['Content-Length'] = str(len(response.content))
+
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = encoding
+        return response
+
+
+class ReplicaRoutingMiddleware:
+    '''
+    Включает чтение с реплик для GET/HEAD запросов. После записи клиент
+    на REPLICA_STICKY_SECONDS закрепляется за основной базой.
+    '''
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        digest = client_digest(request)
+        client_key = digest and f'replica-sticky:{digest}'
+        db_routers.use_replica(
+            request.method in ('GET', 'HEAD')
+            and not (client_key and cache.get(client_key))
+        )
+        try:
+            response = self.get_response(request)
+            if client_key and db_routers.written():
+                cache.set(client_key, True, settings.REPLICA_STICKY_SECONDS)
+        finally:
+            db_routers.reset()
+        return response
+
+
+class IdempotencyMiddleware:
+    '''
+    Повтор небезопасного запроса с тем же заголовком Idempotency-Key
+    получает сохранённый ответ без повторного выполнения view.
+    Отпечаток запроса - метод, путь, тип и тело. Тело multipart-загрузок
+    и потоков больше DATA_UPLOAD_MAX_MEMORY_SIZE не читается, чтобы
+    не буферизовать их: для них учитывается только длина.
+    '''
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        key = request.META.get('HTTP_IDEMPOTENCY_KEY', '')[:255]
+        owner = client_digest(request)
+        if (not key or not owner
+                or request.method in ('GET', 'HEAD', 'OPTIONS')):
+            return self.get_response(request)
+
+        fingerprint = self._fingerprint(request)
+        record, created = self._get_record(owner, key, fingerprint)
+        if not created:
+            return self._replay(record, fingerprint)
+
+        try:
+            response = self.get_response(request)
+        except Exception:
+            record.delete()
+            raise
+        if not self._is_replayable(response):
+            record.delete()
+        else:
+            record.status_code = response.status_code
+            record.content_type = response.get('Content-Type', '')
+            record.content = response.content
+            record.save(update_fields=(
+                'status_code', 'content_type', 'content'
+            ))
+        return response
+
+    def _is_replayable(self, response):
+        '''
+        Сохраняются только успешные ответы и ошибки валидации: 401, 403,
+        409 и 429 зависят от момента запроса, повтор должен выполниться
+        '''
+        if response.streaming:
+            return False
+        status_code = response.status_code
+        return (200 <= status_code < 300
+                or status_code in REPLAYABLE_CLIENT_ERRORS)
+
+    def _fingerprint(self, request):
+        return hashlib.sha256(repr((
+            request.method,
+            request.get_full_path(),
+            request.content_type,
+            self._body_fingerprint(request),
+        )).encode()).hexdigest()
+
+    def _body_fingerprint(self, request):
+        try:
+            length = int(request.META.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            length = 0
+        max_size = settings.DATA_UPLOAD_MAX_MEMORY_SIZE
+        if (request.content_type.startswith('multipart/')
+                or max_size is not None and length > max_size):
+            return length
+        return hashlib.sha256(request.body).hexdigest()
+
+    def _get_record(self, owner, key, fingerprint):
+        expired = timezone.now() - timedelta(
+            seconds=settings.IDEMPOTENCY_KEY_TTL
+        )
+        record, created = IdempotencyKey.objects.get_or_create(
+            owner=owner,
+            key=key,
+            defaults={'fingerprint': fingerprint}
+        )
+        if created:
+            IdempotencyKey.objects.filter(created__lt=expired).delete()
+        elif record.created < expired:
+            record.delete()
+            return self._get_record(owner, key, fingerprint)
+        return record, created
+
+    def _replay(self, record, fingerprint):
+        if record.fingerprint != fingerprint:
+            return JsonResponse(
+                {'detail': 'Ключ уже использован с другим запросом.'},
+                status=422
+            )
+        if record.status_code is None:
+            return JsonResponse(
+                {'detail': 'Запрос с этим ключом ещё выполняется.'},
+                status=409
+            )
+        response = HttpResponse(
+            bytes(record.content),
+            status=record.status_code,
+            content_type=record.content_type or None
+        )
+        response['Idempotent-Replayed'] = 'true'
+        return response
+
+
+def client_digest(request):
+    '''
+    Хэш учётных данных запроса (токен или сессия)
+    '''
+    credentials = (
+        request.META.get('HTTP_AUTHORIZATION')
+        or request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+    )
+    if not credentials:
+        return None
+    return hashlib.sha256(credentials.encode()).hexdigest()
+
+
+class ProfilingMiddleware:
+    '''
+    Профилирование запроса cProfile по заголовку X-Profile или
+    параметру ?profile=1 от администратора, либо каждого
+    PROFILE_SAMPLE_RATE-го запроса в среднем. Остальные запросы
+    платят только проверкой заголовка и параметра.
+    '''
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        reason = None
+        if (request.META.get('HTTP_X_PROFILE')
+                or 'profile' in request.GET):
+            if self._is_admin(request):
+                reason = 'requested'
+        elif (settings.PROFILE_SAMPLE_RATE
+                and random.randrange(settings.PROFILE_SAMPLE_RATE) == 0):
+            reason = 'sampled'
+        if reason is None:
+            return self.get_response(request)
+        return profile_request(self.get_response, request, reason)
+
+    def _is_admin(self, request):
+        user = request.user
+        if not user.is_authenticated:
+            try:
+                authenticated = TokenAuthentication().authenticate(request)
+            except AuthenticationFailed:
+                return False
+            if authenticated is None:
+                return False
+            user = authenticated[0]
+        return user.is_admin
@@ -0,0 +1,41 @@
+# Generated by Django 2.2.19 on 2026-10-19 07:59
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def count_recipe_images(apps, schema_editor):
+    MediaFile = apps.get_model('core', 'MediaFile')
+    Recipe = apps.get_model('recipes', 'Recipe')
+    MediaFile.objects.bulk_create(
+        MediaFile(name=image, references=references)
+        for image, references in Recipe.objects.exclude(
+            image=''
+        ).order_by().values_list('image').annotate(Count('id'))
+    )
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('recipes', '0018_recipe_changes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaFile',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True, verbose_name='Имя файла')),
+                ('references', models.PositiveIntegerField(default=0, verbose_name='Число ссылок')),
+                ('modified', models.DateTimeField(auto_now=True, db_index=True, verbose_name='Дата изменения')),
+            ],
+            options={
+                'verbose_name': 'Медиафайл',
+                'verbose_name_plural': 'Медиафайлы',
+            },
+        ),
+        migrations.RunPython(count_recipe_images, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 2.2.19 on 2026-10-19 08:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IdempotencyKey',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('owner', models.CharField(max_length=64, verbose_name='Клиент')),
+                ('key', models.CharField(max_length=255, verbose_name='Ключ')),
+                ('fingerprint', models.CharField(max_length=64, verbose_name='Отпечаток запроса')),
+                ('status_code', models.PositiveSmallIntegerField(null=True, verbose_name='Код ответа')),
+                ('content_type', models.CharField(blank=True, max_length=255, verbose_name='Тип ответа')),
+                ('content', models.BinaryField(blank=True, verbose_name='Тело ответа')),
+                ('created', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Дата создания')),
+            ],
+            options={
+                'verbose_name': 'Ключ идемпотентности',
+                'verbose_name_plural': 'Ключи идемпотентности',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='idempotencykey',
+            constraint=models.UniqueConstraint(fields=('owner', 'key'), name='unique idempotency key'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 2.2.19 on 2026-10-19 08:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_task'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='started_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Время взятия в работу'),
+        ),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 
 
 class CreateModel(models.Model):
@@ -10,3 +11,142 @@ class CreateModel(models.Model):
 
     class Meta:
         abstract = True
+
+
+class MediaFile(models.Model):
+    '''
+    Модель файлов в хранилище с числом ссылок на них
+    '''
+    name = models.CharField(
+        max_length=255,
+        unique=True,
+        verbose_name='Имя файла'
+    )
+    references = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Число ссылок'
+    )
+    modified = models.DateTimeField(
+        auto_now=True,
+        db_index=True,
+        verbose_name='Дата изменения'
+    )
+
+    class Meta:
+        verbose_name = 'Медиафайл'
+        verbose_name_plural = 'Медиафайлы'
+
+    def __str__(self):
+        return f'name: {self.name}, references: {self.references}'
+
+    @classmethod
+    def add_reference(cls, name):
+        if not name:
+            return
+        cls.objects.get_or_create(name=name)
+        cls.objects.filter(name=name).update(
+            references=models.F('references') + 1,
+            modified=timezone.now()
+        )
+
+    @classmethod
+    def remove_reference(cls, name):
+        if not name:
+            return
+        cls.objects.filter(name=name, references__gt=0).update(
+            references=models.F('references') - 1,
+            modified=timezone.now()
+        )
+
+
+class IdempotencyKey(models.Model):
+    '''
+    Модель ключей Idempotency-Key с сохранённым ответом
+    '''
+    owner = models.CharField(max_length=64, verbose_name='Клиент')
+    key = models.CharField(max_length=255, verbose_name='Ключ')
+    fingerprint = models.CharField(
+        max_length=64,
+        verbose_name='Отпечаток запроса'
+    )
+    status_code = models.PositiveSmallIntegerField(
+        null=True,
+        verbose_name='Код ответа'
+    )
+    content_type = models.CharField(
+        max_length=255,
+        blank=True,
+        verbose_name='Тип ответа'
+    )
+    content = models.BinaryField(blank=True, verbose_name='Тело ответа')
+    created = models.DateTimeField(
+        auto_now_add=True,
+        db_index=True,
+        verbose_name='Дата создания'
+    )
+
+    class Meta:
+        constraints = (
+            models.UniqueConstraint(
+                fields=('owner', 'key'),
+                name='unique idempotency key'
+            ),
+        )
+        verbose_name = 'Ключ идемпотентности'
+        verbose_name_plural = 'Ключи идемпотентности'
+
+    def __str__(self):
+        return f'key: {self.key}, status: {self.status_code}'
+
+
+class Task(models.Model):
+    '''
+    Модель очереди фоновых задач
+    '''
+    PENDING = 'pending'
+    RUNNING = 'running'
+    FAILED = 'failed'
+    STATUSES = (
+        (PENDING, 'Ожидает'),
+        (RUNNING, 'Выполняется'),
+        (FAILED, 'Ошибка'),
+    )
+    name = models.CharField(max_length=200, verbose_name='Задача')
+    arguments = models.TextField(default='[[], {}]', verbose_name='Аргументы')
+    status = models.CharField(
+        max_length=20,
+        choices=STATUSES,
+        default=PENDING,
+        verbose_name='Статус'
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name='Попытки'
+    )
+    max_attempts = models.PositiveSmallIntegerField(
+        default=5,
+        verbose_name='Максимум попыток'
+    )
+    run_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Время запуска'
+    )
+    started_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Время взятия в работу'
+    )
+    last_error = models.TextField(blank=True, verbose_name='Ошибка')
+
+    class Meta:
+        indexes = (
+            models.Index(
+                fields=('status', 'run_at'),
+                name='task_status_run_at_idx'
+            ),
+        )
+        verbose_name = 'Задача'
+        verbose_name_plural = 'Задачи'
+
+    def __str__(self):
+        return f'name: {self.name}, status: {self.status}'
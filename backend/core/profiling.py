@@ -0,0 +1,58 @@
+import cProfile
+import json
+import os
+import re
+import time
+import uuid
+
+from django.conf import settings
+
+
+def save_profile(profile, meta):
+    '''
+    Сохраняет профиль в PROFILE_DIR: <имя>.pstats и <имя>.json
+    с view, методом, путём, статусом и длительностью запроса
+    '''
+    os.makedirs(settings.PROFILE_DIR, exist_ok=True)
+    view = re.sub(r'[^\w.-]+', '_', meta['view']) or 'unknown'
+    name = f'{time.strftime("%Y%m%d-%H%M%S")}-{uuid.uuid4().hex[:8]}-{view}'
+    path = os.path.join(settings.PROFILE_DIR, name)
+    profile.dump_stats(f'{path}.pstats')
+    with open(f'{path}.json', 'w') as file:
+        json.dump(meta, file, ensure_ascii=False)
+    return name
+
+
+def load_profiles():
+    '''
+    Метаданные сохранённых профилей, самые медленные первыми
+    '''
+    if not os.path.isdir(settings.PROFILE_DIR):
+        return []
+    profiles = []
+    for filename in os.listdir(settings.PROFILE_DIR):
+        if not filename.endswith('.json'):
+            continue
+        with open(os.path.join(settings.PROFILE_DIR, filename)) as file:
+            meta = json.load(file)
+        meta['name'] = filename[:-len('.json')]
+        profiles.append(meta)
+    return sorted(profiles, key=lambda meta: -meta['duration_ms'])
+
+
+def profile_request(get_response, request, reason):
+    profile = cProfile.Profile()
+    started = time.perf_counter()
+    response = profile.runcall(get_response, request)
+    duration = (time.perf_counter() - started) * 1000
+    match = request.resolver_match
+    save_profile(profile, {
+        'view': (match.view_name or match._func_path) if match else '',
+        'method': request.method,
+        'path': request.get_full_path(),
+        'status': response.status_code,
+        'duration_ms': round(duration, 2),
+        'reason': reason,
+        'created': time.time(),
+    })
+    return response
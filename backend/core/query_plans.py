@@ -0,0 +1,88 @@
+import re
+
+from django.db import connection, transaction
+from django.db.models import Q
+
+from recipes.models import Favorite, Ingredient, Recipe, ShoppingCart
+from recipes.shopping_lists import get_cart_ingredients
+from users.models import CustomUser, Follow, UserSuggestion
+
+# SQLite: допустим только SEARCH, SCAN ... USING INDEX - тоже обход
+# всей таблицы, только в порядке индекса
+FULL_SCAN = {
+    'sqlite': re.compile(r'\bSCAN (?:TABLE )?(\w+)'),
+    'postgresql': re.compile(r'\bSeq Scan on (\w+)'),
+}
+# Запросы, которым полное чтение разрешено, с причиной
+ALLOWED_FULL_SCANS = {
+    'recipe list': (
+        'побитовое И по маске тэгов не индексируется B-tree: страница '
+        'читается по индексу pub_date до LIMIT с проверкой маски'
+    ),
+    'recipe count': (
+        'COUNT(*) пагинации по маске тэгов проверяет каждый рецепт, '
+        'страницы для анонимов кэшируются'
+    ),
+}
+
+
+def hot_queries(user_id=1, recipe_ids=(1, 2, 3)):
+    '''
+    Горячие запросы API в том виде, в каком их строят представления
+    '''
+    recipes_by_tags = Recipe.objects.filter(tags_mask__hasanybit=0b11)
+    return {
+        'recipe list': recipes_by_tags.select_related('author')[:6],
+        # COUNT(*) пагинации читает те же строки, что и выборка id
+        'recipe count': recipes_by_tags.order_by().values('id'),
+        'recipes of author': Recipe.objects.filter(author_id=user_id)[:3],
+        'recipes of author count': Recipe.objects.filter(
+            author_id=user_id
+        ).order_by().values('id'),
+        'subscriptions': Follow.objects.filter(
+            user_id=user_id
+        ).select_related('author')[:6],
+        'is subscribed': Follow.objects.filter(
+            user_id=user_id, author_id=recipe_ids[0]
+        ).values('id')[:1],
+        'shopping list': get_cart_ingredients(user_id),
+        'favorited flags': Favorite.objects.filter(
+            user_id=user_id, favorite_recipe_id__in=recipe_ids
+        ).values_list('favorite_recipe_id', flat=True),
+        'in shopping cart flags': ShoppingCart.objects.filter(
+            user_id=user_id, recipe_id__in=recipe_ids
+        ).values_list('recipe_id', flat=True),
+        'ingredient search': Ingredient.objects.filter(
+            name__istartswith='сах'
+        )[:20],
+        'user search': CustomUser.objects.filter(
+            Q(username__istartswith='ив')
+            | Q(first_name__istartswith='ив')
+            | Q(last_name__istartswith='ив')
+        ),
+        'suggested authors': UserSuggestion.objects.filter(
+            user_id=user_id
+        ).select_related('suggested'),
+    }
+
+
+def explain_hot_queries():
+    '''
+    Планы горячих запросов: список (имя, план, таблицы с полным чтением)
+    '''
+    full_scan = FULL_SCAN.get(connection.vendor)
+    if full_scan is None:
+        raise NotImplementedError(
+            f'Планы для {connection.vendor} не поддерживаются'
+        )
+    plans = []
+    with transaction.atomic():
+        if connection.vendor == 'postgresql':
+            # На пустой базе планировщик выбирает Seq Scan и при
+            # наличии индекса, поэтому проверяется, что индекс есть.
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+        for name, queryset in hot_queries().items():
+            plan = queryset.explain()
+            plans.append((name, plan, full_scan.findall(plan)))
+    return plans
@@ -0,0 +1,28 @@
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    '''
+    JSON-рендерер на orjson с откатом на стандартный json
+    '''
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        renderer_context = renderer_context or {}
+        if self.get_indent(accepted_media_type, renderer_context):
+            return super().render(data, accepted_media_type, renderer_context)
+        ret = orjson.dumps(
+            data,
+            default=self.encoder_class().default,
+            option=orjson.OPT_NON_STR_KEYS
+        )
+        return ret.replace(
+            b'\xe2\x80\xa8', b'\\u2028'
+        ).replace(
+            b'\xe2\x80\xa9', b'\\u2029'
+        )
@@ -0,0 +1,33 @@
+import hashlib
+import os
+
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.utils import timezone
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    '''
+    Хранилище, в котором имя файла - sha256 содержимого, разложенный
+    по подкаталогам ab/cd/. Одинаковые файлы хранятся один раз.
+    Строка MediaFile обновляется до проверки файла: сборщик мусора
+    не удаляет свежие строки и держит блокировку строки, пока удаляет
+    файл, поэтому загрузка не переиспользует удаляемый файл.
+    '''
+    def _save(self, name, content):
+        digest = hashlib.sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        digest = digest.hexdigest()
+        extension = os.path.splitext(name)[1].lower()
+        name = os.path.join(digest[:2], digest[2:4], digest + extension)
+        from .models import MediaFile
+
+        with transaction.atomic():
+            if not MediaFile.objects.filter(name=name).update(
+                modified=timezone.now()
+            ):
+                MediaFile.objects.get_or_create(name=name)
+            if self.exists(name):
+                return name
+            return super()._save(name, content)
@@ -0,0 +1,167 @@
+import json
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Task
+
+RETRY_BASE_SECONDS = 10
+registry = {}
+periodic = {}
+
+
+def task(func=None, *, name=None, max_attempts=5, dedupe=False, every=None):
+    '''
+    Регистрация фоновой задачи. func.delay(*args, **kwargs) ставит её
+    в очередь после коммита текущей транзакции. Задача без аргументов
+    с every=N секунд выполняется run_tasks периодически.
+    '''
+    def register(func):
+        task_name = name or f'{func.__module__}.{func.__name__}'
+        registry[task_name] = func
+        if every:
+            periodic[task_name] = every
+
+        def delay(*args, **kwargs):
+            enqueue(
+                task_name, args, kwargs,
+                max_attempts=max_attempts,
+                dedupe=dedupe
+            )
+
+        func.task_name = task_name
+        func.delay = delay
+        return func
+
+    if func is None:
+        return register
+    return register(func)
+
+
+def enqueue(name, args=(), kwargs=None, max_attempts=5, dedupe=False):
+    backend = import_string(settings.TASKS_BACKEND)()
+    transaction.on_commit(lambda: backend.enqueue(
+        name, list(args), kwargs or {},
+        max_attempts=max_attempts,
+        dedupe=dedupe
+    ))
+
+
+class EagerBackend:
+    '''
+    Выполняет задачу сразу, для тестов и локальной разработки
+    '''
+    def enqueue(self, name, args, kwargs, **options):
+        registry[name](*args, **kwargs)
+
+
+class DatabaseBackend:
+    '''
+    Очередь в таблице Task, выполняется командой run_tasks
+    '''
+    def enqueue(self, name, args, kwargs, max_attempts=5, dedupe=False):
+        arguments = json.dumps([args, kwargs])
+        if dedupe and Task.objects.filter(
+            name=name,
+            arguments=arguments,
+            status__in=(Task.PENDING, Task.RUNNING)
+        ).exists():
+            return
+        Task.objects.create(
+            name=name,
+            arguments=arguments,
+            max_attempts=max_attempts
+        )
+
+    def claim(self):
+        self.requeue_expired()
+        now = timezone.now()
+        with transaction.atomic():
+            queryset = Task.objects.filter(
+                status=Task.PENDING,
+                run_at__lte=now
+            ).order_by('run_at')
+            if connection.features.has_select_for_update_skip_locked:
+                queryset = queryset.select_for_update(skip_locked=True)
+            queued = queryset.first()
+            if queued is None or not Task.objects.filter(
+                pk=queued.pk,
+                status=Task.PENDING
+            ).update(
+                status=Task.RUNNING,
+                attempts=F('attempts') + 1,
+                started_at=now
+            ):
+                return None
+        queued.status = Task.RUNNING
+        queued.attempts += 1
+        queued.started_at = now
+        return queued
+
+    def requeue_expired(self):
+        '''
+        Задачи упавшего обработчика остаются в статусе running: после
+        истечения аренды они возвращаются в очередь или, если попытки
+        исчерпаны, помечаются ошибкой
+        '''
+        lease_start = timezone.now() - timedelta(
+            seconds=settings.TASK_LEASE_SECONDS
+        )
+        expired = Task.objects.filter(
+            Q(started_at__lt=lease_start) | Q(started_at__isnull=True),
+            status=Task.RUNNING
+        )
+        expired.filter(attempts__gte=F('max_attempts')).update(
+            status=Task.FAILED,
+            last_error='Истекла аренда задачи.'
+        )
+        expired.update(status=Task.PENDING, run_at=timezone.now())
+
+    def run(self, queued):
+        args, kwargs = json.loads(queued.arguments)
+        try:
+            registry[queued.name](*args, **kwargs)
+        except Exception:
+            self.retry(queued, traceback.format_exc())
+            return False
+        queued.delete()
+        if queued.name in periodic:
+            self.schedule(queued.name, periodic[queued.name])
+        return True
+
+    def schedule(self, name, delay=0):
+        '''
+        Ставит периодическую задачу через delay секунд, если её ещё
+        нет в очереди
+        '''
+        if Task.objects.filter(
+            name=name,
+            status__in=(Task.PENDING, Task.RUNNING)
+        ).exists():
+            return
+        Task.objects.create(
+            name=name,
+            run_at=timezone.now() + timedelta(seconds=delay)
+        )
+
+    def schedule_periodic(self):
+        for name in periodic:
+            self.schedule(name)
+
+    def retry(self, queued, error):
+        queued.last_error = error
+        if queued.attempts >= queued.max_attempts:
+            queued.status = Task.FAILED
+        else:
+            queued.status = Task.PENDING
+            queued.run_at = timezone.now() + timedelta(
+                seconds=RETRY_BASE_SECONDS * 2 ** (queued.attempts - 1)
+            )
+        queued.save(update_fields=('last_error', 'status', 'run_at'))
+        if queued.status == Task.FAILED and queued.name in periodic:
+            self.schedule(queued.name, periodic[queued.name])
@@ -0,0 +1,19 @@
+from django.test import TestCase
+
+from core.query_plans import ALLOWED_FULL_SCANS, explain_hot_queries
+
+
+class HotQueryPlansTest(TestCase):
+    '''
+    Горячие запросы API читают таблицы через поиск по индексу
+    '''
+    def test_no_full_scans(self):
+        for name, plan, tables in explain_hot_queries():
+            if name in ALLOWED_FULL_SCANS:
+                continue
+            with self.subTest(query=name):
+                self.assertEqual(tables, [], plan)
+
+    def test_allowed_full_scans_exist(self):
+        names = {name for name, _, _ in explain_hot_queries()}
+        self.assertLessEqual(set(ALLOWED_FULL_SCANS), names)
@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.http.multipartparser import MultiPartParserError
+
+
+class LimitedTemporaryFileUploadHandler(TemporaryFileUploadHandler):
+    '''
+    Загрузка файлов потоком во временный файл. Запросы и файлы больше
+    MAX_UPLOAD_SIZE отклоняются до чтения тела или по ходу загрузки.
+    '''
+    def handle_raw_input(self, input_data, meta, content_length, boundary,
+                         encoding=None):
+        if content_length > settings.MAX_UPLOAD_SIZE:
+            raise MultiPartParserError(
+                f'Размер запроса больше {settings.MAX_UPLOAD_SIZE} байт.'
+            )
+
+    def receive_data_chunk(self, raw_data, start):
+        if start + len(raw_data) > settings.MAX_UPLOAD_SIZE:
+            raise MultiPartParserError(
+                f'Размер файла больше {settings.MAX_UPLOAD_SIZE} байт.'
+            )
+        return super().receive_data_chunk(raw_data, start)
@@ -0,0 +1,82 @@
+import time
+
+from django.db import connections
+from django.urls import Resolver404, resolve
+
+WARM_UP_URLS = (
+    '/api/recipes/',
+    '/api/recipes/1/',
+    '/api/recipes/download_shopping_cart/',
+    '/api/tags/',
+    '/api/ingredients/',
+    '/api/users/',
+    '/api/users/subscriptions/',
+)
+
+
+def open_connections():
+    for connection in connections.all():
+        connection.ensure_connection()
+
+
+def resolve_urls():
+    for path in WARM_UP_URLS:
+        try:
+            resolve(path)
+        except Resolver404:
+            pass
+
+
+def build_serializers():
+    from api import serializers
+
+    for serializer in (
+        serializers.RecipeGetSerializer,
+        serializers.RecipePostSerializer,
+        serializers.CustomUserSerializer,
+        serializers.FollowSerializer,
+        serializers.TagSerializer,
+        serializers.IngredientSerializer,
+    ):
+        serializer().fields
+
+
+def load_catalogs():
+    from recipes.models import Tag
+
+    Tag.get_slug_bits()
+
+
+def load_rankings():
+    from recipes.scores import RANKINGS, get_top_recipe_ids
+
+    for ranking in RANKINGS:
+        get_top_recipe_ids(ranking)
+
+
+STEPS = {
+    'connections': open_connections,
+    'urls': resolve_urls,
+    'serializers': build_serializers,
+    'catalogs': load_catalogs,
+    'rankings': load_rankings,
+}
+
+
+def warm_up(steps=tuple(STEPS)):
+    '''
+    Выполняет работу первого запроса заранее и возвращает время
+    каждого шага в миллисекундах
+    '''
+    timings = []
+    for step in steps:
+        started = time.perf_counter()
+        STEPS[step]()
+        timings.append((step, (time.perf_counter() - started) * 1000))
+    return timings
+
+
+def format_timings(timings):
+    total = sum(elapsed for _, elapsed in timings)
+    steps = ', '.join(f'{step} {elapsed:.1f} ms' for step, elapsed in timings)
+    return f'warm-up {total:.1f} ms: {steps}'
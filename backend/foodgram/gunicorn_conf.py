@@ -0,0 +1,39 @@
+'''
+Конфигурация gunicorn: gunicorn -c python:foodgram.gunicorn_conf
+foodgram.wsgi:application. При GUNICORN_PRELOAD=True приложение и
+прогрев выполняются в мастере и делятся с воркерами copy-on-write,
+в воркере после fork открываются только свои соединения с БД.
+'''
+import multiprocessing
+import os
+
+bind = os.getenv('GUNICORN_BIND', default='0:8000')
+# Без общего кэша поколение страниц, троттлинг и окно реплик у каждого
+# воркера свои, поэтому по умолчанию запускается один воркер
+shared_cache = 'locmem' not in os.getenv('CACHE_BACKEND', default='locmem')
+workers = int(os.getenv(
+    'GUNICORN_WORKERS',
+    default=multiprocessing.cpu_count() * 2 + 1 if shared_cache else 1
+))
+preload_app = (os.getenv('GUNICORN_PRELOAD', default='True') == 'True')
+
+
+def when_ready(server):
+    if not server.cfg.preload_app:
+        return
+    from django.db import connections
+
+    from core.warmup import format_timings, warm_up
+
+    server.log.info(format_timings(warm_up()))
+    connections.close_all()
+
+
+def post_worker_init(worker):
+    from core.warmup import format_timings, warm_up
+
+    if worker.cfg.preload_app:
+        timings = warm_up(('connections',))
+    else:
+        timings = warm_up()
+    worker.log.info(format_timings(timings))
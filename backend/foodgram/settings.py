@@ -33,12 +33,16 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.CompressionMiddleware',
+    'core.middleware.ReplicaRoutingMiddleware',
+    'core.middleware.IdempotencyMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.middleware.ProfilingMiddleware',
 ]
 
 ROOT_URLCONF = 'foodgram.urls'
@@ -70,6 +74,50 @@ DATABASES = {
         'PASSWORD': os.getenv('POSTGRES_PASSWORD', default='postgres'),
         'HOST': os.getenv('DB_HOST', default='db'),
         'PORT': os.getenv('DB_PORT', default='5432'),
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', default=60)),
+        # Через PgBouncer в режиме пула транзакций курсоры на сервере
+        # не переживают транзакцию.
+        'DISABLE_SERVER_SIDE_CURSORS': (
+            os.getenv('DB_PGBOUNCER', default=False) == 'True'
+        ),
+    }
+}
+
+# Для PostgreSQL значения - хосты реплик, для SQLite - пути к файлам.
+DATABASE_REPLICAS = []
+for number, replica in enumerate(
+    os.getenv('DB_REPLICAS', default='').split(), start=1
+):
+    alias = f'replica_{number}'
+    DATABASES[alias] = dict(DATABASES['default'], TEST={'MIRROR': 'default'})
+    if DATABASES[alias]['ENGINE'].endswith('sqlite3'):
+        DATABASES[alias]['NAME'] = replica
+    else:
+        DATABASES[alias]['HOST'] = replica
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['core.db_routers.PrimaryReplicaRouter']
+
+REPLICA_STICKY_SECONDS = int(
+    os.getenv('REPLICA_STICKY_SECONDS', default=10)
+)
+
+# Бюджеты statement_timeout в миллисекундах по statement_timeout_scope
+# представления.
+STATEMENT_TIMEOUTS = {
+    'recipes': int(os.getenv('RECIPES_STATEMENT_TIMEOUT', default=3000)),
+    'shopping_list': int(
+        os.getenv('SHOPPING_LIST_STATEMENT_TIMEOUT', default=5000)
+    ),
+}
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND',
+            default='django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.getenv('CACHE_LOCATION', default=''),
     }
 }
 
@@ -109,13 +157,86 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'static')
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+DEFAULT_FILE_STORAGE = 'core.storage.ContentAddressedStorage'
+
+MAX_UPLOAD_SIZE = int(os.getenv('MAX_UPLOAD_SIZE', default=5 * 1024 * 1024))
+
+FILE_UPLOAD_HANDLERS = [
+    'core.uploads.LimitedTemporaryFileUploadHandler',
+]
+
+RECIPE_VIEWS_FLUSH_INTERVAL = int(
+    os.getenv('RECIPE_VIEWS_FLUSH_INTERVAL', default=10)
+)
+RECIPE_VIEWS_FLUSH_EVENTS = int(
+    os.getenv('RECIPE_VIEWS_FLUSH_EVENTS', default=100)
+)
+
+RECIPES_PAGE_CACHE_TIMEOUT = int(
+    os.getenv('RECIPES_PAGE_CACHE_TIMEOUT', default=60)
+)
+
+SHOPPING_LIST_ASYNC_THRESHOLD = int(
+    os.getenv('SHOPPING_LIST_ASYNC_THRESHOLD', default=50)
+)
+
+TASKS_BACKEND = os.getenv(
+    'TASKS_BACKEND',
+    default='core.tasks.DatabaseBackend'
+)
+
+TASK_LEASE_SECONDS = int(
+    os.getenv('TASK_LEASE_SECONDS', default=15 * 60)
+)
+
+# Интервалы периодических задач run_tasks в секундах
+RECIPE_SCORES_INTERVAL = int(
+    os.getenv('RECIPE_SCORES_INTERVAL', default=60 * 60)
+)
+USER_SUGGESTIONS_INTERVAL = int(
+    os.getenv('USER_SUGGESTIONS_INTERVAL', default=24 * 60 * 60)
+)
+
+IDEMPOTENCY_KEY_TTL = int(
+    os.getenv('IDEMPOTENCY_KEY_TTL', default=24 * 60 * 60)
+)
+
+PROFILE_DIR = os.getenv(
+    'PROFILE_DIR',
+    default=os.path.join(BASE_DIR, 'profiles')
+)
+# Профилировать в среднем один запрос из N, 0 - только по запросу.
+PROFILE_SAMPLE_RATE = int(os.getenv('PROFILE_SAMPLE_RATE', default=0))
+
+COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', default=1024))
+
 REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': [
+        'core.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework.authentication.TokenAuthentication',
     ],
+    'DEFAULT_THROTTLE_CLASSES': [
+        'api.throttling.UserTokenBucketThrottle',
+        'api.throttling.IPTokenBucketThrottle',
+    ],
+    'DEFAULT_THROTTLE_RATES': {
+        'favorite': '30/min',
+        'favorite_ip': '120/min',
+        'shopping_cart': '30/min',
+        'shopping_cart_ip': '120/min',
+        'follow': '30/min',
+        'follow_ip': '120/min',
+        'recipe_create': '10/min',
+        'recipe_create_ip': '30/min',
+        'shopping_list': '5/min',
+        'shopping_list_ip': '20/min',
+    },
 }
 
 DJOSER = {
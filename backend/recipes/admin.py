@@ -1,22 +1,51 @@
 from django.contrib import admin
+from django.db.models import Count
+
+from core.admin import CsvExportMixin
 
 from .models import Favorite, Ingredient, Recipe, Tag
 
 
 @admin.register(Recipe)
-class RecipeAdmin(admin.ModelAdmin):
+class RecipeAdmin(CsvExportMixin, admin.ModelAdmin):
     def recipe_in_favorites_count(self, obj):
         return Favorite.objects.filter(favorite_recipe=obj).count()
 
     recipe_in_favorites_count.short_description = 'In favorites count'
-    list_display = ('name', 'author', 'recipe_in_favorites_count')
+    list_display = (
+        'name',
+        'author',
+        'recipe_in_favorites_count',
+        'views_count'
+    )
+    readonly_fields = ('views_count',)
     list_filter = ('name', 'author__username', 'tags__name')
+    export_fields = (
+        ('id', 'id'),
+        ('name', 'name'),
+        ('author', 'author__username'),
+        ('author email', 'author__email'),
+        ('favorites count', 'favorites_count'),
+        ('views count', 'views_count'),
+        ('cooking time', 'cooking_time'),
+        ('pub date', 'pub_date'),
+    )
+
+    def get_export_queryset(self, queryset):
+        return queryset.annotate(
+            favorites_count=Count('favorite_recipe', distinct=True)
+        )
 
 
 @admin.register(Ingredient)
-class IngredientAdmin(admin.ModelAdmin):
+class IngredientAdmin(CsvExportMixin, admin.ModelAdmin):
     list_display = ('name', 'measurement_unit')
     list_filter = ('name',)
+    export_fields = (
+        ('id', 'id'),
+        ('name', 'name'),
+        ('measurement unit', 'measurement_unit'),
+    )
 
 
 @admin.register(Tag)
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class RecipesConfig(AppConfig):
     name = 'recipes'
+
+    def ready(self):
+        from . import lookups, signals  # noqa: F401
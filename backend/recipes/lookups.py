@@ -0,0 +1,14 @@
+from django.db import models
+
+
+@models.BigIntegerField.register_lookup
+class HasAnyBit(models.Lookup):
+    '''
+    field__hasanybit=mask: есть хотя бы один общий бит с маской
+    '''
+    lookup_name = 'hasanybit'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'({lhs} & {rhs}) <> 0', lhs_params + rhs_params
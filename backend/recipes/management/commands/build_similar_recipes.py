@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from recipes.similarity import BATCH_SIZE, TOP_K, build_similar_recipes
+
+
+class Command(BaseCommand):
+    help = 'Пересчёт таблицы похожих рецептов'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top-k', type=int, default=TOP_K)
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+        parser.add_argument(
+            '--incremental',
+            action='store_true',
+            help='Пересчитать только рецепты, изменённые с прошлого запуска'
+        )
+
+    def handle(self, *args, **options):
+        count = build_similar_recipes(
+            top_k=options['top_k'],
+            batch_size=options['batch_size'],
+            incremental=options['incremental']
+        )
+        self.stdout.write(f'Пересчитано рецептов: {count}')
@@ -0,0 +1,28 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from recipes.transfer import CHUNK_SIZE, export_recipes
+
+
+class Command(BaseCommand):
+    help = 'Выгрузка рецептов в NDJSON, по рецепту на строку'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', help='Файл, по умолчанию stdout')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        if options['output'] is None:
+            self._write(sys.stdout, options['chunk_size'])
+            return
+        with open(options['output'], 'w', encoding='utf-8') as file:
+            count = self._write(file, options['chunk_size'])
+        self.stderr.write(f'Выгружено рецептов: {count}')
+
+    def _write(self, file, chunk_size):
+        count = 0
+        for line in export_recipes(chunk_size=chunk_size):
+            file.write(line)
+            count += 1
+        return count
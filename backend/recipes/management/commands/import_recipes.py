@@ -0,0 +1,44 @@
+import os
+
+from django.core.management.base import BaseCommand
+
+from recipes.transfer import BATCH_SIZE, import_recipes
+
+
+class Command(BaseCommand):
+    help = (
+        'Загрузка рецептов из NDJSON пачками. После сбоя повторный запуск '
+        'продолжает с последней сохранённой пачки.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+        parser.add_argument(
+            '--checkpoint',
+            help='Файл точки продолжения, по умолчанию <path>.checkpoint'
+        )
+
+    def handle(self, *args, **options):
+        checkpoint = options['checkpoint'] or f'{options["path"]}.checkpoint'
+        skip = 0
+        if os.path.exists(checkpoint):
+            with open(checkpoint) as file:
+                skip = int(file.read() or 0)
+            self.stdout.write(f'Продолжение со строки {skip + 1}')
+
+        def save_checkpoint(done):
+            with open(checkpoint, 'w') as file:
+                file.write(str(done))
+
+        with open(options['path'], encoding='utf-8') as file:
+            done, imported = import_recipes(
+                file,
+                skip=skip,
+                batch_size=options['batch_size'],
+                on_batch=save_checkpoint
+            )
+        os.remove(checkpoint)
+        self.stdout.write(
+            f'Обработано строк: {done}, импортировано рецептов: {imported}'
+        )
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from recipes.scores import update_recipe_scores
+
+
+class Command(BaseCommand):
+    help = 'Пересчёт рейтингов popular/trending'
+
+    def handle(self, *args, **options):
+        count = update_recipe_scores()
+        self.stdout.write(f'Рецептов с рейтингом: {count}')
@@ -0,0 +1,44 @@
+# Generated by Django 2.2.19 on 2026-10-19 07:45
+
+from django.db import migrations, models
+
+
+def fill_tag_bits(apps, schema_editor):
+    Tag = apps.get_model('recipes', 'Tag')
+    Recipe = apps.get_model('recipes', 'Recipe')
+    TagRecipe = apps.get_model('recipes', 'TagRecipe')
+    for bit, tag in enumerate(Tag.objects.order_by('id')):
+        tag.bit = bit
+        tag.save(update_fields=('bit',))
+    masks = {}
+    for recipe_id, bit in TagRecipe.objects.values_list(
+            'recipe_id', 'tag__bit'):
+        masks[recipe_id] = masks.get(recipe_id, 0) | (1 << bit)
+    for recipe_id, mask in masks.items():
+        Recipe.objects.filter(pk=recipe_id).update(tags_mask=mask)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0012_auto_20220602_2318'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='tags_mask',
+            field=models.BigIntegerField(default=0, editable=False, verbose_name='Маска тэгов'),
+        ),
+        migrations.AddField(
+            model_name='tag',
+            name='bit',
+            field=models.PositiveSmallIntegerField(editable=False, null=True, verbose_name='Бит в маске тэгов рецепта'),
+        ),
+        migrations.RunPython(fill_tag_bits, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='tag',
+            name='bit',
+            field=models.PositiveSmallIntegerField(editable=False, unique=True, verbose_name='Бит в маске тэгов рецепта'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 2.2.19 on 2026-10-19 07:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0013_tag_bits'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='ingredientrecipe',
+            index=models.Index(fields=['ingredient', 'recipe'], name='ingredient_recipe_idx'),
+        ),
+    ]
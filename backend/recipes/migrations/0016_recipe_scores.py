@@ -0,0 +1,39 @@
+# Generated by Django 2.2.19 on 2026-10-19 07:52
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0015_similar_recipes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='favorite',
+            name='pub_date',
+            field=models.DateTimeField(auto_now_add=True, db_index=True, default=django.utils.timezone.now, verbose_name='Дата публикации'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='shoppingcart',
+            name='pub_date',
+            field=models.DateTimeField(auto_now_add=True, db_index=True, default=django.utils.timezone.now, verbose_name='Дата публикации'),
+            preserve_default=False,
+        ),
+        migrations.CreateModel(
+            name='RecipeScore',
+            fields=[
+                ('recipe', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='score', serialize=False, to='recipes.Recipe', verbose_name='Рецепт')),
+                ('popularity', models.PositiveIntegerField(db_index=True, default=0, verbose_name='Популярность')),
+                ('trending', models.FloatField(db_index=True, default=0, verbose_name='Популярность с затуханием')),
+            ],
+            options={
+                'verbose_name': 'Рейтинг рецепта',
+                'verbose_name_plural': 'Рейтинги рецептов',
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 2.2.19 on 2026-10-19 07:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0016_recipe_scores'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='views_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Просмотры'),
+        ),
+    ]
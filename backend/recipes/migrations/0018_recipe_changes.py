@@ -0,0 +1,29 @@
+# Generated by Django 2.2.19 on 2026-10-19 07:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0017_recipe_views_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeletedRecipe',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('recipe_id', models.PositiveIntegerField(verbose_name='Id рецепта')),
+                ('deleted_at', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Дата удаления')),
+            ],
+            options={
+                'verbose_name': 'Удалённый рецепт',
+                'verbose_name_plural': 'Удалённые рецепты',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['modified', 'id'], name='recipe_modified_id_idx'),
+        ),
+    ]
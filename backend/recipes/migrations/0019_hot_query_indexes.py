@@ -0,0 +1,57 @@
+# Generated by Django 2.2.19 on 2026-10-19 08:12
+
+from django.db import migrations, models
+
+INGREDIENT_NAME_INDEXES = {
+    # Поиск по началу названия без учёта регистра: на PostgreSQL это
+    # UPPER(name) LIKE UPPER('...%'), на SQLite - LIKE с NOCASE.
+    'postgresql': (
+        'CREATE INDEX ingredient_name_prefix_idx ON recipes_ingredient '
+        '(UPPER(name::text) text_pattern_ops)'
+    ),
+    'sqlite': (
+        'CREATE INDEX ingredient_name_prefix_idx ON recipes_ingredient '
+        '(name COLLATE NOCASE)'
+    ),
+}
+
+
+def create_ingredient_name_index(apps, schema_editor):
+    sql = INGREDIENT_NAME_INDEXES.get(schema_editor.connection.vendor)
+    if sql:
+        schema_editor.execute(sql)
+
+
+def drop_ingredient_name_index(apps, schema_editor):
+    if schema_editor.connection.vendor in INGREDIENT_NAME_INDEXES:
+        schema_editor.execute('DROP INDEX ingredient_name_prefix_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0018_recipe_changes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['author', '-pub_date'], name='recipe_author_pub_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='favorite',
+            index=models.Index(fields=['user', 'favorite_recipe'], name='favorite_user_recipe_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ingredientrecipe',
+            index=models.Index(fields=['recipe', 'ingredient'], name='recipe_ingredient_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='shoppingcart',
+            index=models.Index(fields=['user', 'recipe'], name='shopping_cart_user_recipe_idx'),
+        ),
+        migrations.RunPython(
+            create_ingredient_name_index,
+            drop_ingredient_name_index
+        ),
+    ]
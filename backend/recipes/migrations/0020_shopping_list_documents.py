@@ -0,0 +1,46 @@
+# Generated by Django 2.2.19 on 2026-10-19 08:26
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('recipes', '0019_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ShoppingCartVersion',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='+', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+                ('version', models.PositiveIntegerField(default=0, verbose_name='Версия')),
+            ],
+            options={
+                'verbose_name': 'Версия списка покупок',
+                'verbose_name_plural': 'Версии списков покупок',
+            },
+        ),
+        migrations.CreateModel(
+            name='ShoppingListDocument',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('file_format', models.CharField(max_length=10, verbose_name='Формат')),
+                ('version', models.PositiveIntegerField(verbose_name='Версия корзины')),
+                ('content', models.BinaryField(verbose_name='Содержимое')),
+                ('created', models.DateTimeField(auto_now=True, verbose_name='Дата сборки')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+            ],
+            options={
+                'verbose_name': 'Собранный список покупок',
+                'verbose_name_plural': 'Собранные списки покупок',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='shoppinglistdocument',
+            constraint=models.UniqueConstraint(fields=('user', 'file_format'), name='unique shopping list document'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 2.2.19 on 2026-10-19 09:05
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0020_shopping_list_documents'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipescore',
+            name='computed_at',
+            field=models.DateTimeField(db_index=True, default=django.utils.timezone.now, verbose_name='Дата расчёта'),
+            preserve_default=False,
+        ),
+    ]
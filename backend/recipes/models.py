@@ -1,11 +1,19 @@
 import textwrap
 
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator
 from django.db import models
+from django.utils import timezone
 
 from core.models import CreateModel
 from users.models import CustomUser
 
+TAG_BITS_CACHE_KEY = 'recipes:tag-bits'
+TAG_BITS_CACHE_TIMEOUT = 60
+RECIPES_GENERATION_CACHE_KEY = 'recipes:generation'
+MAX_TAG_BITS = 63
+
 
 class Tag(models.Model):
     '''
@@ -27,11 +35,42 @@ class Tag(models.Model):
         null=True,
         verbose_name='Цвет в HEX'
     )
+    bit = models.PositiveSmallIntegerField(
+        unique=True,
+        editable=False,
+        verbose_name='Бит в маске тэгов рецепта'
+    )
 
     class Meta:
         verbose_name = 'Тэг'
         verbose_name_plural = 'Тэги'
 
+    def save(self, *args, **kwargs):
+        if self.bit is None:
+            used_bits = set(Tag.objects.values_list('bit', flat=True))
+            free_bits = [
+                bit for bit in range(MAX_TAG_BITS) if bit not in used_bits
+            ]
+            if not free_bits:
+                raise ValidationError(
+                    f'Нельзя создать больше {MAX_TAG_BITS} тэгов.'
+                )
+            self.bit = free_bits[0]
+        super().save(*args, **kwargs)
+
+    @staticmethod
+    def get_slug_bits():
+        '''
+        Соответствие slug -> бит. С локальным кэшем изменение тэгов
+        сбрасывается только в своём процессе, остальные перечитывают
+        соответствие из БД по истечении TAG_BITS_CACHE_TIMEOUT
+        '''
+        slug_bits = cache.get(TAG_BITS_CACHE_KEY)
+        if slug_bits is None:
+            slug_bits = dict(Tag.objects.values_list('slug', 'bit'))
+            cache.set(TAG_BITS_CACHE_KEY, slug_bits, TAG_BITS_CACHE_TIMEOUT)
+        return slug_bits
+
     def __str__(self):
         return(
             f'name: {self.name}, '
@@ -88,9 +127,33 @@ class Recipe(CreateModel):
         validators=[MinValueValidator(1)],
         verbose_name='Время приготовления'
     )
+    tags_mask = models.BigIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Маска тэгов'
+    )
+    modified = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Дата изменения'
+    )
+    views_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Просмотры'
+    )
 
     class Meta:
         ordering = ('-pub_date',)
+        indexes = (
+            models.Index(
+                fields=('modified', 'id'),
+                name='recipe_modified_id_idx'
+            ),
+            models.Index(
+                fields=('author', '-pub_date'),
+                name='recipe_author_pub_date_idx'
+            ),
+        )
         verbose_name = 'Рецепт'
         verbose_name_plural = 'Рецепты'
 
@@ -104,6 +167,33 @@ class Recipe(CreateModel):
             f'cooking time: {self.cooking_time}'
         )
 
+    def update_tags_mask(self):
+        bits = self.tags.values_list('bit', flat=True)
+        self.tags_mask = sum(1 << bit for bit in set(bits))
+        Recipe.objects.filter(pk=self.pk).update(
+            tags_mask=self.tags_mask,
+            modified=timezone.now()
+        )
+
+
+class DeletedRecipe(models.Model):
+    '''
+    Модель удалённых рецептов для ленты изменений
+    '''
+    recipe_id = models.PositiveIntegerField(verbose_name='Id рецепта')
+    deleted_at = models.DateTimeField(
+        auto_now_add=True,
+        db_index=True,
+        verbose_name='Дата удаления'
+    )
+
+    class Meta:
+        verbose_name = 'Удалённый рецепт'
+        verbose_name_plural = 'Удалённые рецепты'
+
+    def __str__(self):
+        return f'recipe: {self.recipe_id}, deleted at: {self.deleted_at}'
+
 
 class TagRecipe(models.Model):
     '''
@@ -132,11 +222,23 @@ class IngredientRecipe(models.Model):
     )
     amount = models.IntegerField(validators=[MinValueValidator(1)])
 
+    class Meta:
+        indexes = (
+            models.Index(
+                fields=('ingredient', 'recipe'),
+                name='ingredient_recipe_idx'
+            ),
+            models.Index(
+                fields=('recipe', 'ingredient'),
+                name='recipe_ingredient_idx'
+            ),
+        )
+
     def __str__(self):
         return f'{self.ingredient.name} --- {self.recipe.name}, {self.amount}'
 
 
-class Favorite(models.Model):
+class Favorite(CreateModel):
     '''
     Модель избранного
     '''
@@ -158,6 +260,12 @@ class Favorite(models.Model):
             fields=('user', 'favorite_recipe'),
             name='unique favourite'
         )
+        indexes = (
+            models.Index(
+                fields=('user', 'favorite_recipe'),
+                name='favorite_user_recipe_idx'
+            ),
+        )
         verbose_name = 'Избранное'
         verbose_name_plural = 'Избранные'
 
@@ -168,7 +276,7 @@ class Favorite(models.Model):
         )
 
 
-class ShoppingCart(models.Model):
+class ShoppingCart(CreateModel):
     '''
     Модель списка покупок
     '''
@@ -190,6 +298,12 @@ class ShoppingCart(models.Model):
             fields=('user', 'recipe'),
             name='unique recipe in shopping cart'
         )
+        indexes = (
+            models.Index(
+                fields=('user', 'recipe'),
+                name='shopping_cart_user_recipe_idx'
+            ),
+        )
         verbose_name = 'Список покупок'
 
     def __str__(self):
@@ -197,3 +311,133 @@ class ShoppingCart(models.Model):
             f'user: {self.user.username}, '
             f'recipe in shopping cart: {self.recipe.name}'
         )
+
+
+class ShoppingCartVersion(models.Model):
+    '''
+    Модель версии корзины пользователя, растёт при любом изменении
+    корзины или ингредиентов рецептов в ней
+    '''
+    user = models.OneToOneField(
+        CustomUser,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='+',
+        verbose_name='Пользователь'
+    )
+    version = models.PositiveIntegerField(default=0, verbose_name='Версия')
+
+    class Meta:
+        verbose_name = 'Версия списка покупок'
+        verbose_name_plural = 'Версии списков покупок'
+
+    def __str__(self):
+        return f'user: {self.user_id}, version: {self.version}'
+
+
+class ShoppingListDocument(models.Model):
+    '''
+    Модель собранного списка покупок для версии корзины
+    '''
+    user = models.ForeignKey(
+        CustomUser,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Пользователь'
+    )
+    file_format = models.CharField(max_length=10, verbose_name='Формат')
+    version = models.PositiveIntegerField(verbose_name='Версия корзины')
+    content = models.BinaryField(verbose_name='Содержимое')
+    created = models.DateTimeField(auto_now=True, verbose_name='Дата сборки')
+
+    class Meta:
+        constraints = (
+            models.UniqueConstraint(
+                fields=('user', 'file_format'),
+                name='unique shopping list document'
+            ),
+        )
+        verbose_name = 'Собранный список покупок'
+        verbose_name_plural = 'Собранные списки покупок'
+
+    def __str__(self):
+        return (
+            f'user: {self.user_id}, format: {self.file_format}, '
+            f'version: {self.version}'
+        )
+
+
+class RecipeScore(models.Model):
+    '''
+    Модель рейтингов рецептов, заполняется командой update_recipe_scores
+    '''
+    recipe = models.OneToOneField(
+        Recipe,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='score',
+        verbose_name='Рецепт'
+    )
+    popularity = models.PositiveIntegerField(
+        default=0,
+        db_index=True,
+        verbose_name='Популярность'
+    )
+    trending = models.FloatField(
+        default=0,
+        db_index=True,
+        verbose_name='Популярность с затуханием'
+    )
+    computed_at = models.DateTimeField(
+        db_index=True,
+        verbose_name='Дата расчёта'
+    )
+
+    class Meta:
+        verbose_name = 'Рейтинг рецепта'
+        verbose_name_plural = 'Рейтинги рецептов'
+
+    def __str__(self):
+        return (
+            f'recipe: {self.recipe_id}, '
+            f'popularity: {self.popularity}, '
+            f'trending: {self.trending:.3f}'
+        )
+
+
+class SimilarRecipe(models.Model):
+    '''
+    Модель похожих рецептов, заполняется командой build_similar_recipes
+    '''
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name='similar',
+        verbose_name='Рецепт'
+    )
+    similar_recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Похожий рецепт'
+    )
+    score = models.FloatField(verbose_name='Сходство')
+    computed_at = models.DateTimeField(verbose_name='Дата расчёта')
+
+    class Meta:
+        ordering = ('recipe', '-score')
+        indexes = (
+            models.Index(
+                fields=('recipe', '-score'),
+                name='similar_recipe_score_idx'
+            ),
+        )
+        verbose_name = 'Похожий рецепт'
+        verbose_name_plural = 'Похожие рецепты'
+
+    def __str__(self):
+        return (
+            f'recipe: {self.recipe_id}, '
+            f'similar recipe: {self.similar_recipe_id}, '
+            f'score: {self.score:.3f}'
+        )
@@ -0,0 +1,92 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from .models import Favorite, Recipe, RecipeScore, ShoppingCart, Tag
+
+TOP_N = 50
+HALF_LIFE_DAYS = 3
+TRENDING_WINDOW_DAYS = 10 * HALF_LIFE_DAYS
+TOP_CACHE_TIMEOUT = 24 * 60 * 60
+RANKINGS = {
+    'popular': '-score__popularity',
+    'trending': '-score__trending',
+}
+
+
+def _events(since):
+    yield from Favorite.objects.filter(pub_date__gte=since).values_list(
+        'favorite_recipe_id', 'pub_date'
+    ).iterator()
+    yield from ShoppingCart.objects.filter(pub_date__gte=since).values_list(
+        'recipe_id', 'pub_date'
+    ).iterator()
+
+
+def update_recipe_scores():
+    '''
+    Пересчёт таблицы рейтингов: популярность - число добавлений
+    в избранное и списки покупок, trending - та же сумма с весом,
+    убывающим вдвое каждые HALF_LIFE_DAYS дней
+    '''
+    now = timezone.now()
+    popularity = {}
+    for queryset, field in (
+        (Favorite.objects, 'favorite_recipe'),
+        (ShoppingCart.objects, 'recipe'),
+    ):
+        for recipe_id, count in queryset.order_by().values_list(
+            field
+        ).annotate(count=Count('*')):
+            popularity[recipe_id] = popularity.get(recipe_id, 0) + count
+
+    trending = {}
+    half_life = HALF_LIFE_DAYS * 24 * 60 * 60
+    since = now - timedelta(days=TRENDING_WINDOW_DAYS)
+    for recipe_id, created in _events(since):
+        age = (now - created).total_seconds()
+        trending[recipe_id] = (
+            trending.get(recipe_id, 0) + 0.5 ** (age / half_life)
+        )
+
+    with transaction.atomic():
+        RecipeScore.objects.all().delete()
+        RecipeScore.objects.bulk_create(
+            RecipeScore(
+                recipe_id=recipe_id,
+                popularity=count,
+                trending=trending.get(recipe_id, 0),
+                computed_at=now
+            )
+            for recipe_id, count in popularity.items()
+        )
+    return len(popularity)
+
+
+def get_top_recipe_ids(ranking, tags=()):
+    '''
+    Id лучших рецептов по рейтингу, кэшируется для каждого набора тэгов
+    до следующего пересчёта: версия - время последнего расчёта из БД,
+    поэтому пересчёт виден всем процессам
+    '''
+    computed_at = RecipeScore.objects.aggregate(
+        version=Max('computed_at')
+    )['version']
+    version = computed_at and computed_at.timestamp()
+    key = f'recipes:{ranking}:{version}:{",".join(sorted(tags))}'
+    recipe_ids = cache.get(key)
+    if recipe_ids is None:
+        queryset = Recipe.objects.filter(score__popularity__gt=0)
+        if tags:
+            slug_bits = Tag.get_slug_bits()
+            queryset = queryset.filter(tags_mask__hasanybit=sum(
+                1 << slug_bits[slug] for slug in tags if slug in slug_bits
+            ))
+        recipe_ids = list(queryset.order_by(
+            RANKINGS[ranking], '-pub_date'
+        ).values_list('id', flat=True)[:TOP_N])
+        cache.set(key, recipe_ids, TOP_CACHE_TIMEOUT)
+    return recipe_ids
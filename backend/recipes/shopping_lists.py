@@ -0,0 +1,103 @@
+import csv
+import io
+
+from django.db.models import F, Sum
+
+from .models import (IngredientRecipe, ShoppingCart, ShoppingCartVersion,
+                     ShoppingListDocument)
+
+FORMATS = {
+    'txt': ('text/plain', 'shopping_list.txt'),
+    'csv': ('text/csv', 'shopping_list.csv'),
+}
+
+
+def get_cart_version(user_id):
+    return ShoppingCartVersion.objects.filter(
+        user_id=user_id
+    ).values_list('version', flat=True).first() or 0
+
+
+def bump_cart_versions(user_ids):
+    '''
+    Версия хранится в БД, поэтому её рост сразу видят все воркеры
+    и обработчик фоновых задач
+    '''
+    user_ids = list(user_ids)
+    if not user_ids:
+        return
+    ShoppingCartVersion.objects.bulk_create(
+        [ShoppingCartVersion(user_id=user_id) for user_id in user_ids],
+        ignore_conflicts=True
+    )
+    ShoppingCartVersion.objects.filter(user_id__in=user_ids).update(
+        version=F('version') + 1
+    )
+
+
+def get_cart_users(recipe_id):
+    return set(ShoppingCart.objects.filter(
+        recipe_id=recipe_id
+    ).values_list('user_id', flat=True))
+
+
+def get_cart_size(user_id):
+    return ShoppingCart.objects.filter(user_id=user_id).count()
+
+
+def get_cached_document(user_id, version, file_format):
+    content = ShoppingListDocument.objects.filter(
+        user_id=user_id,
+        version=version,
+        file_format=file_format
+    ).values_list('content', flat=True).first()
+    return None if content is None else bytes(content)
+
+
+def is_document_ready(user_id, version, file_format):
+    return ShoppingListDocument.objects.filter(
+        user_id=user_id,
+        version=version,
+        file_format=file_format
+    ).exists()
+
+
+def get_cart_ingredients(user_id):
+    '''
+    Суммы ингредиентов всех рецептов корзины одним запросом
+    '''
+    return IngredientRecipe.objects.filter(
+        recipe__recipe_in_shopping_cart__user_id=user_id
+    ).values_list(
+        'ingredient__name', 'ingredient__measurement_unit'
+    ).annotate(total=Sum('amount')).order_by('ingredient__name')
+
+
+def render_shopping_list(user_id, file_format):
+    ingredients = get_cart_ingredients(user_id)
+    document = io.StringIO()
+    if file_format == 'csv':
+        writer = csv.writer(document)
+        writer.writerow(('Продукт', 'Единица измерения', 'Количество'))
+        writer.writerows(ingredients)
+    else:
+        document.write('Список продуктов:\n')
+        for name, measurement_unit, amount in ingredients:
+            document.write(f'\n{name} ({measurement_unit}) - {amount}')
+    return document.getvalue().encode()
+
+
+def build_document(user_id, version, file_format):
+    '''
+    Сохраняет документ только для актуальной версии корзины, чтобы
+    запоздавшая задача не перезаписала более свежий список
+    '''
+    content = render_shopping_list(user_id, file_format)
+    if version != get_cart_version(user_id):
+        return content
+    ShoppingListDocument.objects.update_or_create(
+        user_id=user_id,
+        file_format=file_format,
+        defaults={'version': version, 'content': content}
+    )
+    return content
@@ -0,0 +1,87 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models.signals import (post_delete, post_init, post_save,
+                                      pre_delete)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from core.models import MediaFile
+
+from .models import (RECIPES_GENERATION_CACHE_KEY, TAG_BITS_CACHE_KEY,
+                     DeletedRecipe, Ingredient, IngredientRecipe, Recipe,
+                     ShoppingCart, Tag, TagRecipe)
+from .shopping_lists import bump_cart_versions, get_cart_users
+
+
+@receiver((post_save, post_delete), sender=Tag)
+def reset_tag_bits(sender, **kwargs):
+    cache.delete(TAG_BITS_CACHE_KEY)
+
+
+@receiver((post_save, post_delete), sender=Recipe)
+@receiver((post_save, post_delete), sender=TagRecipe)
+@receiver((post_save, post_delete), sender=IngredientRecipe)
+@receiver((post_save, post_delete), sender=Tag)
+@receiver((post_save, post_delete), sender=Ingredient)
+@receiver((post_save, post_delete), sender=get_user_model())
+def bump_recipes_generation(sender, update_fields=None, **kwargs):
+    '''
+    Любая запись, видимая в списке рецептов, сбрасывает кэш страниц
+    '''
+    if update_fields and set(update_fields) <= {'last_login', 'password'}:
+        return
+    try:
+        cache.incr(RECIPES_GENERATION_CACHE_KEY)
+    except ValueError:
+        cache.set(RECIPES_GENERATION_CACHE_KEY, 1, None)
+
+
+@receiver((post_save, post_delete), sender=TagRecipe)
+def update_recipe_tags_mask(sender, instance, **kwargs):
+    Recipe(pk=instance.recipe_id).update_tags_mask()
+
+
+@receiver((post_save, post_delete), sender=IngredientRecipe)
+def touch_recipe(sender, instance, **kwargs):
+    Recipe.objects.filter(pk=instance.recipe_id).update(
+        modified=timezone.now()
+    )
+
+
+@receiver((post_save, post_delete), sender=ShoppingCart)
+def bump_cart_version(sender, instance, **kwargs):
+    bump_cart_versions((instance.user_id,))
+
+
+@receiver((post_save, post_delete), sender=IngredientRecipe)
+def bump_carted_recipe_versions(sender, instance, **kwargs):
+    bump_cart_versions(get_cart_users(instance.recipe_id))
+
+
+@receiver(post_delete, sender=Recipe)
+def create_tombstone(sender, instance, **kwargs):
+    DeletedRecipe.objects.create(recipe_id=instance.pk)
+
+
+@receiver(post_init, sender=Recipe)
+def remember_image(sender, instance, **kwargs):
+    image = instance.__dict__.get('image')
+    instance._saved_image = (
+        None if instance.pk is None else getattr(image, 'name', image)
+    )
+
+
+@receiver(post_save, sender=Recipe)
+def count_image_references(sender, instance, **kwargs):
+    if 'image' not in instance.__dict__:
+        return
+    image = instance.image.name
+    if image != instance._saved_image:
+        MediaFile.add_reference(image)
+        MediaFile.remove_reference(instance._saved_image)
+        instance._saved_image = image
+
+
+@receiver(pre_delete, sender=Recipe)
+def release_image(sender, instance, **kwargs):
+    MediaFile.remove_reference(instance.image.name)
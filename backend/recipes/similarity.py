@@ -0,0 +1,164 @@
+import numpy as np
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from .models import IngredientRecipe, Recipe, SimilarRecipe, TagRecipe
+
+TOP_K = 10
+BATCH_SIZE = 64
+TAG_WEIGHT = 0.5
+
+
+def _pairs(queryset, field):
+    return np.array(
+        list(queryset.values_list('recipe_id', field).distinct()),
+        dtype=np.int64
+    ).reshape(-1, 2)
+
+
+class RecipeMatrix:
+    '''
+    Разреженная матрица рецепт x признак (ингредиенты и тэги) в CSR.
+    Строки нормированы, поэтому скалярное произведение - косинусная мера.
+    '''
+    def __init__(self):
+        self.recipe_ids = np.fromiter(
+            Recipe.objects.order_by('id').values_list('id', flat=True),
+            dtype=np.int64
+        )
+        ingredients = _pairs(IngredientRecipe.objects, 'ingredient_id')
+        tags = _pairs(TagRecipe.objects, 'tag_id')
+        ingredient_ids, ingredient_cols = np.unique(
+            ingredients[:, 1], return_inverse=True
+        )
+        tag_ids, tag_cols = np.unique(tags[:, 1], return_inverse=True)
+        self.n_features = len(ingredient_ids) + len(tag_ids)
+
+        rows = np.searchsorted(
+            self.recipe_ids,
+            np.concatenate((ingredients[:, 0], tags[:, 0]))
+        )
+        cols = np.concatenate(
+            (ingredient_cols, tag_cols + len(ingredient_ids))
+        )
+        data = np.concatenate((
+            np.ones(len(ingredients), dtype=np.float32),
+            np.full(len(tags), TAG_WEIGHT, dtype=np.float32)
+        ))
+        order = np.lexsort((cols, rows))
+        rows, self.indices, data = rows[order], cols[order], data[order]
+
+        n_recipes = len(self.recipe_ids)
+        self.lengths = np.bincount(rows, minlength=n_recipes)
+        self.indptr = np.concatenate(([0], np.cumsum(self.lengths)))
+        norms = np.sqrt(np.bincount(rows, weights=data ** 2,
+                                    minlength=n_recipes))
+        self.data = (data / norms[rows]).astype(np.float32)
+        self.row_of_entry = rows
+
+    def rows_for(self, recipe_ids):
+        return np.intersect1d(
+            self.recipe_ids, recipe_ids, return_indices=True
+        )[1]
+
+    def affected_rows(self, rows):
+        '''
+        Строки rows и строки, делящие с ними хотя бы один признак
+        '''
+        features = np.unique(
+            self.indices[np.isin(self.row_of_entry, rows)]
+        )
+        sharing = self.row_of_entry[np.isin(self.indices, features)]
+        return np.union1d(rows, sharing)
+
+    def dense(self, rows):
+        starts = self.indptr[rows]
+        lengths = self.lengths[rows]
+        offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        positions = (
+            np.arange(lengths.sum()) + np.repeat(starts - offsets, lengths)
+        )
+        dense = np.zeros((len(rows), self.n_features), dtype=np.float32)
+        dense[
+            np.repeat(np.arange(len(rows)), lengths),
+            self.indices[positions]
+        ] = self.data[positions]
+        return dense
+
+    def similarities(self, rows):
+        '''
+        Матрица сходства строк rows со всеми рецептами
+        '''
+        products = self.dense(rows)[:, self.indices] * self.data
+        scores = np.zeros((len(rows), len(self.recipe_ids)),
+                          dtype=np.float32)
+        nonempty = np.flatnonzero(self.lengths)
+        if len(nonempty):
+            scores[:, nonempty] = np.add.reduceat(
+                products, self.indptr[nonempty], axis=1
+            )
+        scores[np.arange(len(rows)), rows] = 0
+        return scores
+
+    def top_k(self, rows, k):
+        scores = self.similarities(rows)
+        k = min(k, scores.shape[1])
+        neighbours = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, neighbours, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        return (
+            np.take_along_axis(neighbours, order, axis=1),
+            np.take_along_axis(top_scores, order, axis=1)
+        )
+
+
+def _save(matrix, rows, neighbours, scores, computed_at):
+    recipe_ids = matrix.recipe_ids
+    similar = [
+        SimilarRecipe(
+            recipe_id=int(recipe_ids[row]),
+            similar_recipe_id=int(recipe_ids[neighbour]),
+            score=float(score),
+            computed_at=computed_at
+        )
+        for row, row_neighbours, row_scores in zip(rows, neighbours, scores)
+        for neighbour, score in zip(row_neighbours, row_scores)
+        if score > 0
+    ]
+    with transaction.atomic():
+        SimilarRecipe.objects.filter(
+            recipe_id__in=recipe_ids[rows].tolist()
+        ).delete()
+        SimilarRecipe.objects.bulk_create(similar)
+
+
+def build_similar_recipes(top_k=TOP_K, batch_size=BATCH_SIZE,
+                          incremental=False):
+    '''
+    Пересчёт таблицы похожих рецептов. В инкрементальном режиме
+    пересчитываются рецепты, изменённые после прошлого запуска, и те,
+    на сходство с которыми изменения могли повлиять.
+    '''
+    started = timezone.now()
+    matrix = RecipeMatrix()
+    rows = np.arange(len(matrix.recipe_ids))
+    last_run = SimilarRecipe.objects.aggregate(
+        last_run=Max('computed_at')
+    )['last_run']
+    if incremental and last_run is not None:
+        changed = list(Recipe.objects.filter(
+            modified__gte=last_run
+        ).values_list('id', flat=True))
+        referencing = SimilarRecipe.objects.filter(
+            similar_recipe_id__in=changed
+        ).values_list('recipe_id', flat=True)
+        rows = np.union1d(
+            matrix.affected_rows(matrix.rows_for(changed)),
+            matrix.rows_for(list(referencing))
+        )
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        neighbours, scores = matrix.top_k(batch, top_k)
+        _save(matrix, batch, neighbours, scores, started)
+    return len(rows)
@@ -0,0 +1,22 @@
+from django.conf import settings
+
+from core.tasks import task
+
+from .scores import update_recipe_scores
+from .shopping_lists import build_document
+from .similarity import build_similar_recipes
+
+
+@task(dedupe=True)
+def refresh_similar_recipes():
+    build_similar_recipes(incremental=True)
+
+
+@task(dedupe=True)
+def build_shopping_list(user_id, version, file_format):
+    build_document(user_id, version, file_format)
+
+
+@task(every=settings.RECIPE_SCORES_INTERVAL)
+def refresh_recipe_scores():
+    update_recipe_scores()
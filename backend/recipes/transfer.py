@@ -0,0 +1,190 @@
+import json
+
+from django.db import transaction
+from django.utils.dateparse import parse_datetime
+
+from users.models import CustomUser
+
+from .models import Ingredient, IngredientRecipe, Recipe, Tag, TagRecipe
+
+CHUNK_SIZE = 500
+BATCH_SIZE = 500
+
+
+def _serialize(recipe):
+    return {
+        'name': recipe.name,
+        'text': recipe.text,
+        'cooking_time': recipe.cooking_time,
+        'pub_date': recipe.pub_date.isoformat(),
+        'image': recipe.image.name,
+        'author': recipe.author.username,
+        'tags': [
+            {'name': tag.name, 'slug': tag.slug, 'color': tag.color}
+            for tag in recipe.tags.all()
+        ],
+        'ingredients': [
+            {
+                'name': row.ingredient.name,
+                'measurement_unit': row.ingredient.measurement_unit,
+                'amount': row.amount,
+            }
+            for row in recipe.ingredient.all()
+        ],
+    }
+
+
+def export_recipes(chunk_size=CHUNK_SIZE):
+    '''
+    Рецепты строками NDJSON, по одному самодостаточному рецепту на
+    строку. Читается пачками по id: iterator() в Django 2.2 не
+    выполняет prefetch_related.
+    '''
+    last_id = 0
+    while True:
+        chunk = list(Recipe.objects.filter(
+            id__gt=last_id
+        ).order_by('id').select_related('author').prefetch_related(
+            'tags', 'ingredient__ingredient'
+        )[:chunk_size])
+        if not chunk:
+            return
+        for recipe in chunk:
+            yield json.dumps(_serialize(recipe), ensure_ascii=False) + '\n'
+        last_id = chunk[-1].id
+
+
+def _get_tags(records):
+    '''
+    Тэги по имени: существующий тэг ищется и по имени, и по slug,
+    новый создаётся, только если не нашёлся ни так, ни так
+    '''
+    tags = {}
+    for record in records:
+        for tag in record['tags']:
+            tags.setdefault(tag['name'], tag)
+    by_name = Tag.objects.in_bulk(list(tags), field_name='name')
+    slugs = [
+        tag['slug'] for name, tag in tags.items()
+        if name not in by_name and tag['slug']
+    ]
+    by_slug = Tag.objects.in_bulk(slugs, field_name='slug')
+    for name, tag in tags.items():
+        if name in by_name:
+            continue
+        if tag['slug'] in by_slug:
+            by_name[name] = by_slug[tag['slug']]
+        else:
+            by_name[name] = Tag.objects.create(**tag)
+    return by_name
+
+
+def _get_ingredients(records):
+    keys = {
+        (item['name'], item['measurement_unit'])
+        for record in records for item in record['ingredients']
+    }
+
+    def fetch():
+        return {
+            (ingredient.name, ingredient.measurement_unit): ingredient
+            for ingredient in Ingredient.objects.filter(
+                name__in={name for name, _ in keys}
+            )
+        }
+
+    existing = fetch()
+    missing = keys - set(existing)
+    if not missing:
+        return existing
+    Ingredient.objects.bulk_create(
+        Ingredient(name=name, measurement_unit=unit)
+        for name, unit in missing
+    )
+    return fetch()
+
+
+def _import_batch(records):
+    '''
+    Рецепты вставляются по одному ради сигналов (ссылки на картинки,
+    поколение кэша), связи с тэгами и ингредиентами - bulk_create.
+    Рецепт с тем же автором, названием и датой публикации
+    пропускается: повтор пачки после сбоя ничего не дублирует, а
+    одноимённые рецепты одного автора загружаются все.
+    '''
+    authors = CustomUser.objects.in_bulk(
+        {record['author'] for record in records}, field_name='username'
+    )
+    tags = _get_tags(records)
+    ingredients = _get_ingredients(records)
+    existing = set(Recipe.objects.filter(
+        author__in=authors.values(),
+        name__in={record['name'] for record in records}
+    ).values_list('author__username', 'name', 'pub_date'))
+    imported = []
+    tag_rows = []
+    ingredient_rows = []
+    for record in records:
+        author = authors.get(record['author'])
+        pub_date = parse_datetime(record['pub_date'])
+        key = (record['author'], record['name'], pub_date)
+        if author is None or key in existing:
+            continue
+        existing.add(key)
+        recipe_tags = [tags[tag['name']] for tag in record['tags']]
+        recipe = Recipe(
+            author=author,
+            name=record['name'],
+            text=record['text'],
+            cooking_time=record['cooking_time'],
+            image=record['image'],
+            tags_mask=sum({1 << tag.bit for tag in recipe_tags}),
+        )
+        recipe.save()
+        recipe.pub_date = pub_date
+        imported.append(recipe)
+        tag_rows.extend(
+            TagRecipe(tag=tag, recipe=recipe) for tag in recipe_tags
+        )
+        ingredient_rows.extend(
+            IngredientRecipe(
+                recipe=recipe,
+                ingredient=ingredients[
+                    (item['name'], item['measurement_unit'])
+                ],
+                amount=item['amount']
+            )
+            for item in record['ingredients']
+        )
+    Recipe.objects.bulk_update(imported, ('pub_date',))
+    TagRecipe.objects.bulk_create(tag_rows)
+    IngredientRecipe.objects.bulk_create(ingredient_rows)
+    return len(imported)
+
+
+def import_recipes(lines, skip=0, batch_size=BATCH_SIZE, on_batch=None):
+    '''
+    Загрузка NDJSON пачками по batch_size строк, каждая пачка в своей
+    транзакции. Первые skip строк пропускаются, после каждой пачки
+    on_batch получает число обработанных строк - это точка продолжения.
+    Возвращает (обработано строк, импортировано рецептов).
+    '''
+    done = imported = 0
+    batch = []
+    for line in lines:
+        done += 1
+        if done <= skip or not line.strip():
+            continue
+        batch.append(json.loads(line))
+        if len(batch) >= batch_size:
+            with transaction.atomic():
+                imported += _import_batch(batch)
+            batch = []
+            if on_batch:
+                on_batch(done)
+    if batch:
+        with transaction.atomic():
+            imported += _import_batch(batch)
+    if on_batch:
+        on_batch(done)
+    return done, imported
@@ -1,15 +1,31 @@
 from django.contrib import admin
 
+from core.admin import CsvExportMixin
+
 from .models import CustomUser, Follow
 
 
 @admin.register(CustomUser)
-class UserAdmin(admin.ModelAdmin):
+class UserAdmin(CsvExportMixin, admin.ModelAdmin):
     list_display = ('username', 'email', 'access_level')
     search_fields = ('username', 'email', 'access_level')
     list_filter = ('username', 'email')
+    export_fields = (
+        ('id', 'id'),
+        ('username', 'username'),
+        ('email', 'email'),
+        ('first name', 'first_name'),
+        ('last name', 'last_name'),
+        ('access level', 'access_level'),
+        ('date joined', 'date_joined'),
+    )
 
 
 @admin.register(Follow)
-class TagAdmin(admin.ModelAdmin):
+class TagAdmin(CsvExportMixin, admin.ModelAdmin):
     list_display = ('user', 'author')
+    export_fields = (
+        ('id', 'id'),
+        ('user', 'user__username'),
+        ('author', 'author__username'),
+    )
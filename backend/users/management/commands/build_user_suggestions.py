@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from users.suggestions import (BATCH_SIZE, SUGGESTIONS_PER_USER,
+                               build_user_suggestions)
+
+
+class Command(BaseCommand):
+    help = 'Пересчёт рекомендованных авторов по графу подписок'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=SUGGESTIONS_PER_USER)
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        count = build_user_suggestions(
+            limit=options['limit'],
+            batch_size=options['batch_size']
+        )
+        self.stdout.write(f'Пересчитано пользователей: {count}')
@@ -0,0 +1,60 @@
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+SEARCH_FIELDS = ('username', 'first_name', 'last_name')
+PREFIX_INDEXES = {
+    # Поиск по началу строки без учёта регистра: на PostgreSQL это
+    # UPPER(field) LIKE UPPER('...%'), на SQLite - LIKE с NOCASE.
+    'postgresql': (
+        'CREATE INDEX user_{0}_prefix_idx ON users_customuser '
+        '(UPPER({0}::text) text_pattern_ops)'
+    ),
+    'sqlite': (
+        'CREATE INDEX user_{0}_prefix_idx ON users_customuser '
+        '({0} COLLATE NOCASE)'
+    ),
+}
+
+
+def create_prefix_indexes(apps, schema_editor):
+    sql = PREFIX_INDEXES.get(schema_editor.connection.vendor)
+    if sql:
+        for field in SEARCH_FIELDS:
+            schema_editor.execute(sql.format(field))
+
+
+def drop_prefix_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor in PREFIX_INDEXES:
+        for field in SEARCH_FIELDS:
+            schema_editor.execute(f'DROP INDEX user_{field}_prefix_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_follow_user_author_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserSuggestion',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField(verbose_name='Вес')),
+                ('computed_at', models.DateTimeField(verbose_name='Дата расчёта')),
+                ('suggested', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Рекомендованный автор')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='suggestions', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+            ],
+            options={
+                'verbose_name': 'Рекомендованный автор',
+                'verbose_name_plural': 'Рекомендованные авторы',
+                'ordering': ('user', '-score'),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='usersuggestion',
+            index=models.Index(fields=['user', '-score'], name='user_suggestion_score_idx'),
+        ),
+        migrations.RunPython(create_prefix_indexes, drop_prefix_indexes),
+    ]
@@ -54,6 +54,12 @@ class Follow(models.Model):
         models.UniqueConstraint(
             fields=('user', 'author'),
             name='unique follow')
+        indexes = (
+            models.Index(
+                fields=('user', 'author'),
+                name='follow_user_author_idx'
+            ),
+        )
         verbose_name = 'Подписка'
         verbose_name_plural = 'Подписки'
         default_related_name = 'follows'
@@ -63,3 +69,41 @@ class Follow(models.Model):
             f'user: {self.user.username}, '
             f'author: {self.author.username}'
         )
+
+
+class UserSuggestion(models.Model):
+    '''
+    Модель рекомендованных авторов, заполняется командой
+    build_user_suggestions
+    '''
+    user = models.ForeignKey(
+        CustomUser,
+        on_delete=models.CASCADE,
+        related_name='suggestions',
+        verbose_name='Пользователь'
+    )
+    suggested = models.ForeignKey(
+        CustomUser,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Рекомендованный автор'
+    )
+    score = models.FloatField(verbose_name='Вес')
+    computed_at = models.DateTimeField(verbose_name='Дата расчёта')
+
+    class Meta:
+        ordering = ('user', '-score')
+        indexes = (
+            models.Index(
+                fields=('user', '-score'),
+                name='user_suggestion_score_idx'
+            ),
+        )
+        verbose_name = 'Рекомендованный автор'
+        verbose_name_plural = 'Рекомендованные авторы'
+
+    def __str__(self):
+        return (
+            f'user: {self.user_id}, '
+            f'suggested: {self.suggested_id}, score: {self.score}'
+        )
@@ -0,0 +1,64 @@
+import math
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from .models import CustomUser, Follow, UserSuggestion
+
+SUGGESTIONS_PER_USER = 20
+BATCH_SIZE = 500
+
+
+def _suggest(user_id, following, recipes_count, limit):
+    '''
+    Авторы, на которых подписаны авторы пользователя: вес - число
+    таких подписок, умноженное на log(2 + число рецептов автора)
+    '''
+    paths = Counter()
+    for followee in following.get(user_id, ()):
+        paths.update(following.get(followee, ()))
+    scores = {
+        author: count * math.log(2 + recipes_count.get(author, 0))
+        for author, count in paths.items()
+        if author != user_id and author not in following[user_id]
+    }
+    return sorted(scores.items(), key=lambda item: -item[1])[:limit]
+
+
+def build_user_suggestions(limit=SUGGESTIONS_PER_USER,
+                           batch_size=BATCH_SIZE):
+    '''
+    Пересчёт таблицы рекомендованных авторов по графу подписок
+    '''
+    following = defaultdict(set)
+    for user_id, author_id in Follow.objects.values_list(
+        'user_id', 'author_id'
+    ).iterator():
+        following[user_id].add(author_id)
+    recipes_count = dict(CustomUser.objects.annotate(
+        count=Count('recipes')
+    ).filter(count__gt=0).values_list('id', 'count'))
+    computed_at = timezone.now()
+    user_ids = list(following)
+    for start in range(0, len(user_ids), batch_size):
+        batch = user_ids[start:start + batch_size]
+        suggestions = [
+            UserSuggestion(
+                user_id=user_id,
+                suggested_id=author_id,
+                score=score,
+                computed_at=computed_at
+            )
+            for user_id in batch
+            for author_id, score in _suggest(
+                user_id, following, recipes_count, limit
+            )
+        ]
+        with transaction.atomic():
+            UserSuggestion.objects.filter(user_id__in=batch).delete()
+            UserSuggestion.objects.bulk_create(suggestions)
+    # Рекомендации пользователей без подписок остались от прошлых запусков
+    UserSuggestion.objects.filter(computed_at__lt=computed_at).delete()
+    return len(user_ids)
@@ -0,0 +1,10 @@
+from django.conf import settings
+
+from core.tasks import task
+
+from .suggestions import build_user_suggestions
+
+
+@task(every=settings.USER_SUGGESTIONS_INTERVAL)
+def refresh_user_suggestions():
+    build_user_suggestions()